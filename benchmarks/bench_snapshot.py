@@ -0,0 +1,74 @@
+"""
+Time building the snapshot views of a game, one per player and a public
+one, for 2 to 36 players with a full deck dealt.
+
+Run from the repository root: PYTHONPATH=src python benchmarks/bench_snapshot.py
+"""
+import timeit
+from datetime import datetime
+from uuid import uuid4
+
+from auth.schemas import UserInfoDTO
+from game.dealer import Dealer
+from game.projections import GameProjection
+from game.schemas import FullCardInfoDTO
+from game.state import GameState
+
+
+def make_state(players_number: int) -> GameState:
+    deal = Dealer(seed=players_number).deal(1, "BR", players_number)
+    players = [
+        UserInfoDTO(
+            id=uuid4(),
+            username=f"user-{number}",
+            email=f"user-{number}@example.com",
+            elo=1000,
+            created_at=datetime(2025, 1, 1),
+        )
+        for number in range(players_number)
+    ]
+    return GameState(
+        game_id=uuid4(),
+        round_id=uuid4(),
+        round_name="BR",
+        round_number=1,
+        trump_suit=deal.trump_suit,
+        trump_value=deal.trump_value,
+        opening_player_id=players[0].id,
+        players=players,
+        hands={
+            player.id: [
+                FullCardInfoDTO(
+                    id=uuid4(),
+                    suit=card.suit,
+                    value=card.value,
+                    user_id=player.id,
+                )
+                for card in hand
+            ]
+            for player, hand in zip(players, deal.hands)
+        },
+    )
+
+
+def main() -> None:
+    print(
+        f"{'players':>7} {'views':>5} {'total, us':>10} "
+        f"{'per view, us':>13}"
+    )
+    for players_number in (2, 4, 6, 9, 12, 18, 36):
+        state = make_state(players_number)
+        number = 200
+        total = timeit.timeit(
+            lambda: GameProjection().get_views(state), number=number
+        )
+        per_call = total / number * 1e6
+        views = players_number + 1
+        print(
+            f"{players_number:>7} {views:>5} {per_call:>10.1f} "
+            f"{per_call / views:>13.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
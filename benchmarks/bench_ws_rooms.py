@@ -0,0 +1,135 @@
+"""
+Time connects and broadcasts of the lobby and game WebSocket managers with
+many rooms served concurrently.
+
+Run from the repository root:
+PYTHONPATH=src python benchmarks/bench_ws_rooms.py --rooms 10000
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from auth.schemas import UserInfoDTO
+from managers import GameWSManager, LobbyWSManager, WSManager
+
+
+class FakeWebSocket:
+    """
+    Accepts and sends instantly, but yields to the event loop like a real
+    socket does on every call.
+    """
+
+    async def accept(self) -> None:
+        await asyncio.sleep(0)
+
+    async def send_json(self, data: object) -> None:
+        await asyncio.sleep(0)
+
+    async def send_text(self, data: str) -> None:
+        await asyncio.sleep(0)
+
+
+def make_user() -> UserInfoDTO:
+    user_id = uuid4()
+    return UserInfoDTO(
+        id=user_id,
+        username=f"user-{user_id}",
+        email=f"{user_id}@example.com",
+        elo=1000,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def make_rooms(
+    rooms_number: int, users_number: int
+) -> dict[UUID, list[UserInfoDTO]]:
+    return {
+        uuid4(): [make_user() for _ in range(users_number)]
+        for _ in range(rooms_number)
+    }
+
+
+async def timed(
+    name: str, operations: int, coroutines: list, manager: WSManager
+) -> None:
+    started_at = time.perf_counter()
+    await asyncio.gather(*coroutines)
+    await manager.drain()
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"{name:>16} {operations:>8} {elapsed:>9.3f} "
+        f"{operations / elapsed:>12.0f}"
+    )
+
+
+async def bench_lobby(rooms: dict[UUID, list[UserInfoDTO]]) -> None:
+    manager = LobbyWSManager()
+    await timed(
+        "lobby connect",
+        sum(map(len, rooms.values())),
+        [
+            manager.connect(FakeWebSocket(), user, lobby_id)
+            for lobby_id, users in rooms.items()
+            for user in users
+        ],
+        manager,
+    )
+    await timed(
+        "lobby broadcast",
+        len(rooms),
+        [
+            manager.broadcast(lobby_id, {"event": "ping", "data": "1"})
+            for lobby_id in rooms
+        ],
+        manager,
+    )
+    for lobby_id, users in rooms.items():
+        for user in users:
+            await manager.disconnect(user.id, lobby_id)
+
+
+async def bench_game(rooms: dict[UUID, list[UserInfoDTO]]) -> None:
+    manager = GameWSManager()
+    await timed(
+        "game connect",
+        sum(map(len, rooms.values())),
+        [
+            manager.connect_spectator_to_game(FakeWebSocket(), user, game_id)
+            for game_id, users in rooms.items()
+            for user in users
+        ],
+        manager,
+    )
+    await timed(
+        "game broadcast",
+        len(rooms),
+        [
+            manager.send_frame_to_spectators(game_id, '{"event":"ping"}')
+            for game_id in rooms
+        ],
+        manager,
+    )
+    for game_id, users in rooms.items():
+        for user in users:
+            await manager.disconnect_spectator_from_game(user.id, game_id)
+
+
+async def run(rooms_number: int, users_number: int) -> None:
+    rooms = make_rooms(rooms_number, users_number)
+    print(f"{'':>16} {'ops':>8} {'total, s':>9} {'ops/sec':>12}")
+    await bench_lobby(rooms)
+    await bench_game(rooms)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rooms", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run(args.rooms, args.users))
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,11 @@
-from .models import Friendship, User
+# Models are loaded on first access, so the schemas can be imported
+# without the database configuration.
+_MODELS = ("Friendship", "User")
+
+
+def __getattr__(name: str):
+    if name in _MODELS:
+        from . import models
+
+        return getattr(models, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
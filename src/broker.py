@@ -0,0 +1,225 @@
+"""
+Publish/subscribe brokers behind the WebSocket managers.
+
+Managers publish every message on their channel and deliver the messages
+they receive to the sockets connected to their own worker, so a message
+reaches its users whatever worker they are connected to.
+"""
+import asyncio
+import itertools
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+from uuid import uuid4
+
+import asyncpg
+from pydantic_core import to_json
+
+from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, WS_BROKER
+
+logger = logging.getLogger(__name__)
+
+Message = dict[str, Any]
+Handler = Callable[[Message], None]
+
+
+class Broker(ABC):
+    @abstractmethod
+    async def publish(self, channel: str, message: Message) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        """
+        Call ``handler`` with every message published on the channel,
+        including the messages of this worker.
+        """
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    """
+    Broker of a single worker, messages are handed to the handlers as is.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, list[Handler]] = {}
+
+    async def publish(self, channel: str, message: Message) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Broker handler failed on %s", channel)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+
+class PostgresBroker(Broker):
+    """
+    Broker over Postgres LISTEN/NOTIFY.
+
+    A message is handed to the handlers of this worker at once and sent to
+    the other workers by a background task, which sends the messages
+    published meanwhile in one transaction, so publishers never wait for
+    Postgres. A notification payload is limited to 8000 bytes, so messages
+    are sent as ASCII JSON in chunks
+    ``<worker id>.<message number>:<index>:<count>:<data>``, which Postgres
+    delivers together and in order. Chunks of a message cut short by a lost
+    connection are dropped after ``PARTS_TTL`` seconds.
+    """
+
+    CHUNK_SIZE = 7900
+    PARTS_TTL = 30.0
+
+    def __init__(self, dsn: str, reconnect_delay: float = 1.0) -> None:
+        self._dsn = dsn
+        self._reconnect_delay = reconnect_delay
+        self._worker_id = uuid4().hex
+        self._message_numbers = itertools.count()
+        self._handlers: dict[str, list[Handler]] = {}
+        self._parts: dict[str, tuple[float, list[str]]] = {}
+        self._outbox: asyncio.Queue[tuple[str, Message]] = asyncio.Queue()
+        self._sender: asyncio.Task | None = None
+        self._pool: asyncpg.Pool | None = None
+        self._listener: asyncpg.Connection | None = None
+        self._lock = asyncio.Lock()
+
+    async def publish(self, channel: str, message: Message) -> None:
+        self._handle(channel, message)
+        self._outbox.put_nowait((channel, message))
+        if self._sender is None or self._sender.done():
+            self._sender = asyncio.create_task(self._send())
+
+    async def drain(self) -> None:
+        """
+        Wait until the published messages are sent to Postgres.
+        """
+        await self._outbox.join()
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        async with self._lock:
+            is_new = channel not in self._handlers
+            self._handlers.setdefault(channel, []).append(handler)
+            if self._listener is None:
+                await self._connect()
+            elif is_new:
+                await self._listener.add_listener(channel, self._on_notify)
+
+    async def _send(self) -> None:
+        while True:
+            batch = [await self._outbox.get()]
+            while not self._outbox.empty():
+                batch.append(self._outbox.get_nowait())
+            try:
+                await self._notify(batch)
+            except Exception:
+                logger.exception(
+                    "Broker failed to send %d messages", len(batch)
+                )
+            finally:
+                for _ in batch:
+                    self._outbox.task_done()
+
+    async def _notify(self, batch: list[tuple[str, Message]]) -> None:
+        notifications = [
+            (channel, chunk)
+            for channel, message in batch
+            for chunk in self._get_chunks(message)
+        ]
+        async with self._lock:
+            if self._pool is None:
+                self._pool = await asyncpg.create_pool(
+                    self._dsn, min_size=1, max_size=4
+                )
+        async with self._pool.acquire() as connection:
+            async with connection.transaction():
+                await connection.executemany(
+                    "SELECT pg_notify($1, $2)", notifications
+                )
+
+    def _get_chunks(self, message: Message) -> list[str]:
+        payload = to_json(message, ensure_ascii=True).decode()
+        message_id = f"{self._worker_id}.{next(self._message_numbers)}"
+        chunks = [
+            payload[i : i + self.CHUNK_SIZE]
+            for i in range(0, len(payload), self.CHUNK_SIZE)
+        ]
+        return [
+            f"{message_id}:{index}:{len(chunks)}:{chunk}"
+            for index, chunk in enumerate(chunks)
+        ]
+
+    async def _connect(self) -> None:
+        self._listener = await asyncpg.connect(self._dsn)
+        self._listener.add_termination_listener(self._on_termination)
+        for channel in self._handlers:
+            await self._listener.add_listener(channel, self._on_notify)
+
+    def _on_termination(self, _: asyncpg.Connection) -> None:
+        logger.warning("Broker connection lost, reconnecting")
+        self._listener = None
+        asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        while True:
+            await asyncio.sleep(self._reconnect_delay)
+            async with self._lock:
+                if self._listener is not None:
+                    return
+                try:
+                    await self._connect()
+                    return
+                except (OSError, asyncpg.PostgresError):
+                    self._listener = None
+                    logger.exception("Broker reconnection failed")
+
+    def _on_notify(
+        self,
+        connection: asyncpg.Connection,
+        pid: int,
+        channel: str,
+        payload: str,
+    ) -> None:
+        message_id, _, count, chunk = payload.split(":", 3)
+        if message_id.startswith(f"{self._worker_id}."):
+            return
+        if count == "1":
+            self._handle(channel, json.loads(chunk))
+            return
+        if message_id not in self._parts:
+            self._evict_parts()
+            self._parts[message_id] = (time.monotonic(), [])
+        parts = self._parts[message_id][1]
+        parts.append(chunk)
+        if len(parts) < int(count):
+            return
+        del self._parts[message_id]
+        self._handle(channel, json.loads("".join(parts)))
+
+    def _evict_parts(self) -> None:
+        deadline = time.monotonic() - self.PARTS_TTL
+        for message_id, (started, _) in list(self._parts.items()):
+            if started < deadline:
+                del self._parts[message_id]
+
+    def _handle(self, channel: str, message: Message) -> None:
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(message)
+            except Exception:
+                logger.exception("Broker handler failed on %s", channel)
+
+
+def create_broker(name: str = WS_BROKER) -> Broker:
+    if name == "postgres":
+        return PostgresBroker(
+            f"postgresql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+        )
+    return InProcessBroker()
+
+
+broker = create_broker()
@@ -1,4 +1,4 @@
-from decouple import config
+from decouple import Choices, Csv, config
 
 DB_HOST = config("POSTGRES_HOST")
 DB_PORT = config("POSTGRES_PORT")
@@ -10,3 +10,42 @@ SECRET_KEY = config("SECRET_KEY")
 ALGORITHM = config("ALGORITHM")
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
+
+# Worker processes owning rooms, empty to run a single worker
+SHARD_ID = config("SHARD_ID", default=0, cast=int)
+SHARD_URLS = config("SHARD_URLS", default="", cast=Csv())
+
+# Outbound frames queued per WebSocket and what to do with a full queue:
+# "drop" the new frame, "coalesce" it with a queued frame of the same kind
+# or "evict" the slow client
+WS_QUEUE_SIZE = config("WS_QUEUE_SIZE", default=256, cast=int)
+WS_QUEUE_POLICY = config(
+    "WS_QUEUE_POLICY",
+    default="evict",
+    cast=Choices(["drop", "coalesce", "evict"]),
+)
+
+# Pub/sub between workers: "memory" for a single worker, "postgres" to
+# reach the users connected to any worker through LISTEN/NOTIFY
+WS_BROKER = config(
+    "WS_BROKER", default="memory", cast=Choices(["memory", "postgres"])
+)
+
+# WebSocket pings at the protocol level, done by uvicorn, close half-open
+# sockets and their endpoints then unregister them
+UVICORN_WS_PING_INTERVAL = config(
+    "UVICORN_WS_PING_INTERVAL", default=20.0, cast=float
+)
+UVICORN_WS_PING_TIMEOUT = config(
+    "UVICORN_WS_PING_TIMEOUT", default=20.0, cast=float
+)
+
+# Optional app-level heartbeat: every interval the server sends
+# {"event": "ping"} and drops sockets silent for WS_PING_TIMEOUT seconds,
+# so only enable it for clients answering {"event": "pong"}. 0 disables it
+WS_PING_INTERVAL = config("WS_PING_INTERVAL", default=20.0, cast=float)
+WS_PING_TIMEOUT = config("WS_PING_TIMEOUT", default=0.0, cast=float)
+
+# Seconds during which state events of a room (ready users, members,
+# watchers) are merged and only the latest is sent, 0 sends every one
+WS_COALESCE_TICK = config("WS_COALESCE_TICK", default=0.0, cast=float)
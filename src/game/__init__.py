@@ -1 +1,11 @@
-from .models import Game, GamePlayer, GameType, GameWinner
+# Models are loaded on first access, so the rules, cards and simulator
+# modules can be imported without the database configuration.
+_MODELS = ("Game", "GamePlayer", "GameType", "GameWinner")
+
+
+def __getattr__(name: str):
+    if name in _MODELS:
+        from . import models
+
+        return getattr(models, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
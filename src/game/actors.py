@@ -0,0 +1,113 @@
+import asyncio
+from typing import Any, Awaitable, Callable, TypeVar
+from uuid import UUID
+
+from game.exceptions import GameIsBusyError
+
+T = TypeVar("T")
+
+Command = Callable[[], Awaitable[Any]]
+
+
+class GameActor:
+    """
+    Single writer of a game.
+
+    Commands are queued and run one at a time by the task of the actor,
+    so moves of a game are applied and published strictly in order and
+    need no locks around the game state or the database rows.
+    """
+
+    def __init__(self, game_id: UUID, max_queue_size: int = 64) -> None:
+        self.game_id = game_id
+        self._queue: asyncio.Queue[
+            tuple[Command, asyncio.Future]
+        ] = asyncio.Queue(max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def max_queue_size(self) -> int:
+        return self._queue.maxsize
+
+    async def submit(self, command: Callable[[], Awaitable[T]]) -> T:
+        """
+        Queue the command and wait for its result.
+
+        Raises ``GameIsBusyError`` without queueing when the queue is full.
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((command, future))
+        except asyncio.QueueFull:
+            raise GameIsBusyError
+        return await future
+
+    def stop(self) -> None:
+        self._task.cancel()
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+
+    async def _run(self) -> None:
+        while True:
+            command, future = await self._queue.get()
+            if future.cancelled():
+                continue
+            try:
+                result = await command()
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+
+class GameActorRegistry:
+    """
+    Routes the commands of every game to its actor, actors are started on
+    the first command of a game.
+    """
+
+    def __init__(self, max_queue_size: int = 64) -> None:
+        self._max_queue_size = max_queue_size
+        self._actors: dict[UUID, GameActor] = {}
+
+    async def submit(
+        self, game_id: UUID, command: Callable[[], Awaitable[T]]
+    ) -> T:
+        actor = self._actors.get(game_id)
+        if actor is None:
+            actor = self._actors[game_id] = GameActor(
+                game_id, self._max_queue_size
+            )
+        return await actor.submit(command)
+
+    @property
+    def max_queue_size(self) -> int:
+        return self._max_queue_size
+
+    def get_queue_depth(self, game_id: UUID) -> int:
+        actor = self._actors.get(game_id)
+        return actor.queue_depth if actor is not None else 0
+
+    def get_queue_depths(self) -> dict[UUID, int]:
+        return {
+            game_id: actor.queue_depth
+            for game_id, actor in self._actors.items()
+        }
+
+    def stop(self, game_id: UUID) -> None:
+        actor = self._actors.pop(game_id, None)
+        if actor is not None:
+            actor.stop()
+
+
+game_actors = GameActorRegistry()
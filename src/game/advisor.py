@@ -0,0 +1,135 @@
+"""
+Monte Carlo bid advisor.
+
+Deals the unseen cards to the other seats many times and plays every deal
+out at once with NumPy: hands are bit masks in a ``uint64`` array, one per
+sample and seat, so each step plays one card in all sampled deals and the
+Python loop only runs over tricks and seats.
+"""
+from typing import Sequence
+
+import numpy as np
+
+from game import cards, rules
+from game.cards import SuitLiteral
+from game.schemas import BidAdviceDTO, CardDTO
+
+_RANKS = len(cards.VALUES)
+_SUITS_NUMBER = len(cards.SUITS)
+
+
+def _get_strength_bits(trump_suit: SuitLiteral | None) -> np.ndarray:
+    """
+    Map card indexes to bits ordered by the strength of the cards, so the
+    highest bit of a mask is its strongest card: trumps above all other
+    cards, then cards by value.
+    """
+    bits = np.empty(cards.DECK_SIZE, dtype=np.uint64)
+    for index in range(cards.DECK_SIZE):
+        suit = cards.get_suit(index)
+        rank = cards.get_value(index) - cards.VALUES.start
+        if suit == trump_suit:
+            bits[index] = _RANKS * _SUITS_NUMBER + rank
+        else:
+            bits[index] = rank * _SUITS_NUMBER + cards.SUITS.index(suit)
+    return bits
+
+
+def _get_highest_bit(masks: np.ndarray) -> np.ndarray:
+    # Masks use at most 45 bits, so they convert to float64 exactly.
+    return np.frexp(masks.astype(np.float64))[1].astype(np.uint64) - 1
+
+
+def estimate_tricks(
+    hand: Sequence[CardDTO],
+    trump_suit: SuitLiteral | None,
+    seat: int,
+    players_number: int,
+    samples: int = 10_000,
+    seed: int | None = None,
+    trump_value: int | None = None,
+) -> BidAdviceDTO:
+    """
+    Estimate the distribution of tricks the hand takes.
+
+    ``seat`` is the position in the turn order, 0 leads the first trick.
+    Every seat plays its strongest allowed card, a simple but stable
+    model of the play.
+    """
+    per_player = len(hand)
+    known = cards.to_mask(hand)
+    if known.bit_count() != per_player:
+        raise ValueError("The hand has repeated cards.")
+    if trump_suit is not None and trump_value is not None:
+        trump_bit = 1 << cards.get_index(trump_suit, trump_value)
+        if known & trump_bit:
+            raise ValueError("The trump card is in the hand.")
+        known |= trump_bit
+    unseen = [i for i in range(cards.DECK_SIZE) if not known & (1 << i)]
+    others = players_number - 1
+    if not 0 <= seat < players_number or per_player * others > len(unseen):
+        raise ValueError("The hand does not fit the number of players.")
+
+    bits = _get_strength_bits(trump_suit)
+    one = np.uint64(1)
+    card_masks = one << bits
+    suit_masks = np.zeros(_SUITS_NUMBER, dtype=np.uint64)
+    for index in range(cards.DECK_SIZE):
+        suit_masks[index // cards.SUIT_SIZE] |= card_masks[index]
+    bit_suits = np.zeros(int(bits.max()) + 1, dtype=np.int64)
+    bit_suits[bits] = np.arange(cards.DECK_SIZE) // cards.SUIT_SIZE
+    trump_mask = (
+        suit_masks[cards.SUITS.index(trump_suit)]
+        if trump_suit is not None
+        else np.uint64(0)
+    )
+
+    rng = np.random.default_rng(seed)
+    deck = rng.permuted(np.tile(card_masks[unseen], (samples, 1)), axis=1)
+    dealt = deck[:, : per_player * others].reshape(samples, others, per_player)
+    hands = np.empty((samples, players_number), dtype=np.uint64)
+    hands[:, seat] = np.bitwise_or.reduce(
+        card_masks[[cards.encode(card) for card in hand]]
+    )
+    other_seats = [s for s in range(players_number) if s != seat]
+    hands[:, other_seats] = np.bitwise_or.reduce(dealt, axis=2)
+
+    rows = np.arange(samples)
+    leaders = np.zeros(samples, dtype=np.int64)
+    tricks = np.zeros((samples, players_number), dtype=np.int64)
+    played = np.empty((samples, players_number), dtype=np.uint64)
+    for _ in range(per_player):
+        seat_hands = hands[rows, leaders]
+        highest = _get_highest_bit(seat_hands)
+        chosen = one << highest
+        hands[rows, leaders] = seat_hands ^ chosen
+        played[rows, leaders] = chosen
+        required = suit_masks[bit_suits[highest]] | trump_mask
+        for offset in range(1, players_number):
+            seats = (leaders + offset) % players_number
+            seat_hands = hands[rows, seats]
+            playable = seat_hands & required
+            playable = np.where(playable != 0, playable, seat_hands)
+            highest = _get_highest_bit(playable)
+            chosen = one << highest
+            hands[rows, seats] = seat_hands ^ chosen
+            played[rows, seats] = chosen
+        leaders = (played & required[:, None]).argmax(axis=1)
+        tricks[rows, leaders] += 1
+
+    distribution = (
+        np.bincount(tricks[:, seat], minlength=per_player + 1) / samples
+    )
+    expected_scores = [
+        sum(
+            probability * rules.get_score_addition(bid, taken)
+            for taken, probability in enumerate(distribution)
+        )
+        for bid in range(per_player + 1)
+    ]
+    return BidAdviceDTO(
+        distribution=distribution.tolist(),
+        expected_tricks=float(np.dot(np.arange(per_player + 1), distribution)),
+        recommended_bid=int(np.argmax(expected_scores)),
+        samples=samples,
+    )
@@ -0,0 +1,111 @@
+"""
+Compact card encoding used by the rule engine.
+
+Each of the 36 cards is a bit index ``suit_index * 9 + (value - 6)``,
+so a hand or a trick is a single int mask and a suit is a 9-bit slice
+of it. Within a suit a higher value has a higher bit.
+"""
+from typing import Iterable, Literal
+
+from game.schemas import CardDTO
+
+SuitLiteral = Literal["H", "D", "C", "S"]
+
+SUITS: tuple[SuitLiteral, ...] = ("H", "D", "C", "S")
+VALUES = range(6, 15)
+SUIT_SIZE = len(VALUES)
+DECK_SIZE = len(SUITS) * SUIT_SIZE
+
+FULL_DECK = (1 << DECK_SIZE) - 1
+SUIT_MASKS = {
+    suit: ((1 << SUIT_SIZE) - 1) << (index * SUIT_SIZE)
+    for index, suit in enumerate(SUITS)
+}
+
+_SUIT_INDEXES = {suit: index for index, suit in enumerate(SUITS)}
+_CARDS = tuple(
+    CardDTO(suit=suit, value=value) for suit in SUITS for value in VALUES
+)
+
+
+def get_index(suit: SuitLiteral, value: int) -> int:
+    return _SUIT_INDEXES[suit] * SUIT_SIZE + value - VALUES.start
+
+
+def encode(card: CardDTO) -> int:
+    return get_index(card.suit, card.value)
+
+
+def decode(index: int) -> CardDTO:
+    return _CARDS[index]
+
+
+def get_suit(index: int) -> SuitLiteral:
+    return SUITS[index // SUIT_SIZE]
+
+
+def get_value(index: int) -> int:
+    return index % SUIT_SIZE + VALUES.start
+
+
+def to_mask(cards: Iterable[CardDTO]) -> int:
+    mask = 0
+    for card in cards:
+        mask |= 1 << encode(card)
+    return mask
+
+
+def iter_indexes(mask: int) -> Iterable[int]:
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def from_mask(mask: int) -> list[CardDTO]:
+    return [_CARDS[index] for index in iter_indexes(mask)]
+
+
+def is_playable(
+    index: int,
+    hand: int,
+    lead_suit: SuitLiteral | None,
+    trump_suit: SuitLiteral | None,
+) -> bool:
+    """
+    A card may be played if it is the lead, follows the lead suit, is a
+    trump, or the hand has neither lead suit nor trump cards.
+    """
+    if lead_suit is None:
+        return True
+    required = SUIT_MASKS[lead_suit]
+    if trump_suit is not None:
+        required |= SUIT_MASKS[trump_suit]
+    return bool((1 << index) & required) or not hand & required
+
+
+def get_playable_mask(
+    hand: int, lead_suit: SuitLiteral | None, trump_suit: SuitLiteral | None
+) -> int:
+    """
+    Return the mask of the cards of the hand that may be played.
+    """
+    if lead_suit is None:
+        return hand
+    required = SUIT_MASKS[lead_suit]
+    if trump_suit is not None:
+        required |= SUIT_MASKS[trump_suit]
+    return hand & required or hand
+
+
+def get_winning_index(
+    trick: int, lead_suit: SuitLiteral, trump_suit: SuitLiteral | None
+) -> int:
+    """
+    Return the bit index of the card that takes the trick mask.
+    """
+    if trump_suit is not None and trick & SUIT_MASKS[trump_suit]:
+        candidates = trick & SUIT_MASKS[trump_suit]
+    else:
+        candidates = trick & SUIT_MASKS[lead_suit]
+    return candidates.bit_length() - 1
@@ -0,0 +1,75 @@
+import random
+
+from game import cards, rules
+from game.cards import SuitLiteral
+from game.schemas import RoundDealDTO
+
+
+class Dealer:
+    """
+    Deals rounds by shuffling the deck once and slicing it into hands,
+    the first card after the hands is the trump card.
+
+    Every round gets its own random generator derived from the game seed,
+    so any round can be re-dealt on its own and deals are reproducible.
+    """
+
+    def __init__(self, seed: int | None = None) -> None:
+        self._seed = seed if seed is not None else random.getrandbits(63)
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    def pick_first_dealer(self, players_number: int) -> int:
+        return random.Random(f"{self._seed}").randrange(players_number)
+
+    def deal(
+        self, round_number: int, round_name: str, players_number: int
+    ) -> RoundDealDTO:
+        hands, trump_suit, trump_value = self._deal_indexes(
+            round_number, round_name, players_number
+        )
+        return RoundDealDTO(
+            hands=[[cards.decode(index) for index in hand] for hand in hands],
+            trump_suit=trump_suit,
+            trump_value=trump_value,
+        )
+
+    def deal_masks(
+        self, round_number: int, round_name: str, players_number: int
+    ) -> tuple[list[int], SuitLiteral | None, int | None]:
+        """
+        Same deal as ``deal`` with every hand as a card mask.
+        """
+        hands, trump_suit, trump_value = self._deal_indexes(
+            round_number, round_name, players_number
+        )
+        return (
+            [sum(1 << index for index in hand) for hand in hands],
+            trump_suit,
+            trump_value,
+        )
+
+    def _deal_indexes(
+        self, round_number: int, round_name: str, players_number: int
+    ) -> tuple[list[list[int]], SuitLiteral | None, int | None]:
+        rng = random.Random(f"{self._seed}:{round_number}")
+        deck = list(range(cards.DECK_SIZE))
+        rng.shuffle(deck)
+        per_player = rules.get_cards_per_player(round_name, players_number)
+        hands = [
+            deck[i * per_player : (i + 1) * per_player]
+            for i in range(players_number)
+        ]
+        if round_name == "NTR":
+            return hands, None, None
+        dealt = per_player * players_number
+        if dealt == cards.DECK_SIZE:
+            return hands, rng.choice(cards.SUITS), None
+        trump_index = deck[dealt]
+        trump_suit = cards.get_suit(trump_index)
+        trump_value = cards.get_value(trump_index)
+        if trump_suit == "S" and trump_value == 7:
+            return hands, None, None
+        return hands, trump_suit, trump_value
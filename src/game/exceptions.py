@@ -1,6 +1,34 @@
 class GameIsFinishedError(Exception):
     """Raised when an action is attempted on a finished game."""
 
-    def __init__(self, message="The game is finished."):
+    def __init__(self, message: str = "The game is finished.") -> None:
+        self.message = message
+        super().__init__(self.message)
+
+
+class InvalidMoveError(Exception):
+    """Raised when a player's move breaks the game rules."""
+
+    def __init__(self, message: str = "The move is not allowed.") -> None:
+        self.message = message
+        super().__init__(self.message)
+
+
+class GameTypeError(Exception):
+    """Raised when an action is not available for the type of the game."""
+
+    def __init__(
+        self, message: str = "The action is not available for this game."
+    ) -> None:
+        self.message = message
+        super().__init__(self.message)
+
+
+class GameIsBusyError(Exception):
+    """Raised when the command queue of a game is full."""
+
+    def __init__(
+        self, message: str = "The game is busy, try again later."
+    ) -> None:
         self.message = message
         super().__init__(self.message)
@@ -2,7 +2,13 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import UUID, ForeignKey, UniqueConstraint
+from sqlalchemy import (
+    JSON,
+    UUID,
+    BigInteger,
+    ForeignKey,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from auth.models import User
@@ -22,6 +28,11 @@ class GamePlayer(Base):
         ForeignKey("users.id", ondelete="CASCADE"),
         primary_key=True,
     )
+    position: Mapped[int | None] = mapped_column(nullable=True)
+    score: Mapped[int] = mapped_column(
+        default=0, server_default="0", nullable=False
+    )
+    elo_delta: Mapped[int | None] = mapped_column(nullable=True)
 
 
 class GameWinner(Base):
@@ -54,6 +65,7 @@ class Game(Base):
     is_finished: Mapped[bool] = mapped_column(default=False, nullable=False)
     created_at: Mapped[created_at]
     finished_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    seed: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
 
     players: Mapped[list["User"]] = relationship(
         secondary="game_players", back_populates="games"
@@ -216,3 +228,36 @@ class Card(Base):
         if not 6 <= value <= 14:
             raise ValueError(f"Value should be between 6 and 14, got {value}")
         return value
+
+
+class GameEvent(Base):
+    __tablename__ = "game_events"
+
+    game_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("games.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    seq: Mapped[int] = mapped_column(primary_key=True)
+    type: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[created_at]
+
+
+class GameSnapshot(Base):
+    __tablename__ = "game_snapshots"
+
+    # The primary key index is enough, so no extra index on the id.
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    game_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("games.id", ondelete="CASCADE"),
+        index=True,
+    )
+    round_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("rounds.id", ondelete="CASCADE"),
+    )
+    seq: Mapped[int] = mapped_column(nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[created_at]
@@ -0,0 +1,89 @@
+from typing import Literal
+from uuid import UUID
+
+from game.schemas import (
+    PUBLIC_VIEW,
+    FullGameCardInfoDTO,
+    ViewerId,
+)
+from game.state import GameState
+
+SnapshotEventLiteral = Literal["full_game_card_info", "game_is_finished"]
+
+
+class GameProjection:
+    """
+    Serialized views of game states that hide other players' hands.
+
+    Every state version is projected into one view per player, where only
+    the player's own hand is visible, and one public view for spectators.
+    The views are cached until the state changes, so sending a snapshot
+    to many recipients does not serialize it again for every socket.
+    """
+
+    def __init__(self) -> None:
+        self._views: dict[
+            UUID, tuple[GameState, int, dict[ViewerId, str]]
+        ] = {}
+
+    def get_views(self, state: GameState) -> dict[ViewerId, str]:
+        cached = self._views.get(state.game_id)
+        if cached is not None:
+            cached_state, version, views = cached
+            if cached_state is state and version == state.version:
+                return views
+        views = self._build_views(state.to_dto())
+        self._views[state.game_id] = (state, state.version, views)
+        return views
+
+    def get_frames(
+        self, state: GameState, event: SnapshotEventLiteral, seq: int
+    ) -> dict[ViewerId, str]:
+        """
+        Wrap the cached views into serialized snapshot events.
+        """
+        prefix = f'{{"event":"{event}","seq":{seq},"data":'
+        return {
+            viewer_id: f"{prefix}{view}}}"
+            for viewer_id, view in self.get_views(state).items()
+        }
+
+    def discard(self, game_id: UUID) -> None:
+        self._views.pop(game_id, None)
+
+    @staticmethod
+    def _build_views(
+        game_info: FullGameCardInfoDTO,
+    ) -> dict[ViewerId, str]:
+        """
+        Serialize every player once with the hand and once without, in a
+        single pass, and join the fragments into the views, so the players
+        are not serialized again for every view.
+        """
+        head, tail = (
+            game_info.model_copy(update={"users": []})
+            .model_dump_json(by_alias=True)
+            .split('"users":[]', 1)
+        )
+        hidden_users: list[str] = []
+        own_users: list[str] = []
+        for user in game_info.users:
+            hidden_users.append(
+                user.model_copy(update={"cards": []}).model_dump_json(
+                    by_alias=True
+                )
+            )
+            own_users.append(user.model_dump_json(by_alias=True))
+
+        def join(users: list[str]) -> str:
+            return f'{head}"users":[{",".join(users)}]{tail}'
+
+        views: dict[ViewerId, str] = {PUBLIC_VIEW: join(hidden_users)}
+        for seat, user in enumerate(game_info.users):
+            users = list(hidden_users)
+            users[seat] = own_users[seat]
+            views[user.id] = join(users)
+        return views
+
+
+game_projection = GameProjection()
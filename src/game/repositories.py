@@ -1,22 +1,29 @@
-from typing import Sequence
+from typing import Annotated, Sequence
 from uuid import UUID
 
-from sqlalchemy import select
+from pydantic import Field, TypeAdapter
+from sqlalchemy import and_, func, literal_column, select
+from sqlalchemy.dialects.postgresql import JSON
 
 from auth import models as auth_models
 from auth.schemas import UserInfoDTO
 from game import models
 from game.exceptions import GameIsFinishedError
 from game.schemas import (
-    CardDTO,
-    EntryIdDTO,
-    FlattenFullGameCardInfoDTO,
+    GameEventDTO,
+    GameSnapshotDTO,
     LobbyIdDTO,
     LobbyInfoDTO,
+    PlayerRatingDTO,
+    PlayerSnapshotDTO,
     RoundInfoDTO,
 )
 from repository import SQLAlchemyRepository
 
+_game_event_adapter = TypeAdapter(
+    Annotated[GameEventDTO, Field(discriminator="event")]
+)
+
 
 class LobbyRepository(SQLAlchemyRepository):
     model = models.Lobby
@@ -67,61 +74,94 @@ class LobbyPlayerRepository(SQLAlchemyRepository):
 class GameRepository(SQLAlchemyRepository):
     model = models.Game
 
-    async def get_full_game_info(
+    async def get_game_snapshot(
         self, game_id: UUID
-    ) -> list[FlattenFullGameCardInfoDTO]:
+    ) -> list[PlayerSnapshotDTO]:
+        """
+        Get the current round of the game with one row per player.
+
+        Hands and the cards of the unfinished trick are aggregated
+        into JSON arrays by the database.
+        """
+        card = func.json_build_object(
+            literal_column("'id'"),
+            models.Card.id,
+            literal_column("'suit'"),
+            models.Card.suit,
+            literal_column("'value'"),
+            models.Card.value,
+            literal_column("'user_id'"),
+            models.Dealing.user_id,
+            literal_column("'entry_id'"),
+            models.Card.entry_id,
+        )
         query = (
             select(
-                models.Round.id,
-                auth_models.User.id,
+                models.Round.id.label("round_id"),
+                models.Round.round_name,
+                models.Round.round_number,
+                models.Round.trump_suit,
+                models.Round.trump_value,
+                models.Round.opening_player_id,
+                auth_models.User.id.label("user_id"),
                 auth_models.User.username,
                 auth_models.User.email,
                 auth_models.User.elo,
                 auth_models.User.created_at,
-                models.Card.id,
-                models.Card.suit,
-                models.Card.value,
-                models.Card.entry_id,
-                models.Round.trump_suit,
-                models.Round.trump_value,
-                models.Round.opening_player_id,
+                models.GamePlayer.position,
+                models.GamePlayer.score.label("total_score"),
                 models.Dealing.bid,
                 models.Dealing.actual_bid,
                 models.Dealing.score,
+                func.json_agg(card, type_=JSON)
+                .filter(models.Card.entry_id.is_(None))
+                .label("hand"),
+                func.json_agg(card, type_=JSON)
+                .filter(models.Entry.is_finished.is_(False))
+                .label("trick"),
             )
+            .select_from(models.Round)
+            .join(models.Dealing, models.Dealing.round_id == models.Round.id)
             .join(
-                models.Dealing, models.Dealing.user_id == auth_models.User.id
+                auth_models.User, auth_models.User.id == models.Dealing.user_id
+            )
+            .join(
+                models.GamePlayer,
+                and_(
+                    models.GamePlayer.game_id == models.Round.game_id,
+                    models.GamePlayer.user_id == models.Dealing.user_id,
+                ),
+            )
+            .outerjoin(
+                models.Card, models.Card.dealing_id == models.Dealing.id
             )
-            .join(models.Round, models.Dealing.round_id == models.Round.id)
-            .join(models.Card, models.Card.dealing_id == models.Dealing.id)
+            .outerjoin(models.Entry, models.Entry.id == models.Card.entry_id)
             .filter(
                 models.Round.game_id == game_id,
                 models.Round.is_current_round == True,
             )
+            .group_by(
+                models.Round.id,
+                models.Dealing.id,
+                auth_models.User.id,
+                models.GamePlayer.game_id,
+                models.GamePlayer.user_id,
+            )
+            .order_by(models.GamePlayer.position, auth_models.User.id)
         )
         res = await self._session.execute(query)
         return [
-            FlattenFullGameCardInfoDTO(
-                round_id=player[0],
-                user_id=player[1],
-                username=player[2],
-                email=player[3],
-                elo=player[4],
-                created_at=player[5],
-                card_id=player[6],
-                suit=player[7].value if player[7] is not None else None,
-                value=player[8],
-                entry_id=player[9],
-                trump_suit=player[10].value
-                if player[10] is not None
-                else None,
-                trump_value=player[11],
-                opening_player_id=player[12],
-                bid=player[13],
-                actual_bid=player[14],
-                score=player[15],
+            PlayerSnapshotDTO(
+                **row._asdict()
+                | {
+                    "trump_suit": row.trump_suit.value
+                    if row.trump_suit is not None
+                    else None,
+                    "hand": row.hand or [],
+                    "trick": row.trick or [],
+                }
             )
-            for player in res.fetchall()
+            for row in res.fetchall()
         ]
 
 
@@ -137,6 +177,13 @@ class GamePlayerRepository(SQLAlchemyRepository):
         res = await self._session.execute(query)
         return res.scalar() is not None
 
+    async def get_ratings(self, /, game_id: UUID) -> list[PlayerRatingDTO]:
+        query = select(self.model.user_id, self.model.score).filter(
+            self.model.game_id == game_id
+        )
+        res = await self._session.execute(query)
+        return [PlayerRatingDTO.model_validate(row) for row in res.fetchall()]
+
 
 class GameWinnerRepository(SQLAlchemyRepository):
     model = models.GameWinner
@@ -197,67 +244,56 @@ class RoundRepository(SQLAlchemyRepository):
             opening_player_id=round_.opening_player_id,
         )
 
-    async def get_previous_round(
-        self, /, game_id: UUID
-    ) -> models.Round | None:
-        query = (
-            select(self.model)
-            .filter_by(game_id=game_id, is_current_round=False)
-            .order_by(self.model.round_number.desc())
-            .limit(1)
-        )
-        res = await self._session.execute(query)
-        return res.scalar_one_or_none()
-
 
 class DealingRepository(SQLAlchemyRepository):
     model = models.Dealing
 
-    async def get_current_dealing(
-        self, /, round_id: UUID, user_id: UUID
-    ) -> models.Dealing | None:
-        query = (
-            select(self.model)
-            .filter_by(round_id=round_id, user_id=user_id)
-            .limit(1)
-        )
-        res = await self._session.execute(query)
-        return res.scalar_one_or_none()
-
 
 class CardRepository(SQLAlchemyRepository):
     model = models.Card
 
-    async def get_cards_by_entry_id(self, /, entry_id: UUID) -> list[CardDTO]:
-        cards = await self.get_all(entry_id=entry_id)
-        return [
-            CardDTO(
-                suit=card.suit.value if card.suit else None,
-                value=card.value,
-            )
-            for card in cards
-        ]
 
-    async def get_cards_by_dealing_id(
-        self, /, dealing_id: UUID
-    ) -> list[CardDTO]:
-        cards = await self.get_all(dealing_id=dealing_id)
+class EntryRepository(SQLAlchemyRepository):
+    model = models.Entry
+
+
+class GameEventRepository(SQLAlchemyRepository):
+    model = models.GameEvent
+
+    async def get_tail(
+        self, /, game_id: UUID, after_seq: int = 0
+    ) -> list[GameEventDTO]:
+        query = (
+            select(self.model.seq, self.model.type, self.model.payload)
+            .filter(self.model.game_id == game_id, self.model.seq > after_seq)
+            .order_by(self.model.seq)
+        )
+        res = await self._session.execute(query)
         return [
-            CardDTO(
-                suit=card.suit.value if card.suit else None,
-                value=card.value,
+            _game_event_adapter.validate_python(
+                {"event": row.type, "seq": row.seq, "data": row.payload}
             )
-            for card in cards
+            for row in res
         ]
 
+    async def get_last_seq(self, /, game_id: UUID) -> int:
+        query = select(func.max(self.model.seq)).filter_by(game_id=game_id)
+        res = await self._session.execute(query)
+        return res.scalar() or 0
 
-class EntryRepository(SQLAlchemyRepository):
-    model = models.Entry
 
-    async def get_or_create(
-        self, round_id: UUID, owner_id: UUID
-    ) -> EntryIdDTO:
-        obj = await self.get_last(round_id=round_id)
-        if obj is None:
-            obj = await self.add(round_id=round_id, owner_id=owner_id)
-        return EntryIdDTO.model_validate(obj)
+class GameSnapshotRepository(SQLAlchemyRepository):
+    model = models.GameSnapshot
+
+    async def get_latest(self, /, game_id: UUID) -> GameSnapshotDTO | None:
+        query = (
+            select(self.model.round_id, self.model.seq, self.model.payload)
+            .filter_by(game_id=game_id)
+            .order_by(self.model.seq.desc(), self.model.created_at.desc())
+            .limit(1)
+        )
+        res = await self._session.execute(query)
+        snapshot = res.first()
+        if snapshot is None:
+            return None
+        return GameSnapshotDTO.model_validate(snapshot)
@@ -1,15 +1,34 @@
+import logging
+from typing import Awaitable, Callable
 from uuid import UUID
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from pydantic import ValidationError
 
 from auth.services.user import UserService
 from dependencies import AuthenticatedUserDep, UOWDep, WSAuthenticatedUserDep
-from game.exceptions import GameIsFinishedError
+from game.actors import game_actors
+from game.exceptions import (
+    GameIsBusyError,
+    GameIsFinishedError,
+    GameTypeError,
+    InvalidMoveError,
+)
+from game.projections import game_projection
 from game.schemas import (
-    BidEventDTO,
-    FullGameCardInfoEventDTO,
+    PUBLIC_VIEW,
+    BidAdviceDTO,
+    BidAdviceRequestDTO,
     GameIdPayloadDTO,
+    GameQueueDTO,
     GameStartEventDTO,
     LobbyIdDTO,
     NewWatcherEventDTO,
@@ -17,8 +36,15 @@ from game.schemas import (
 )
 from game.services.game import GameService
 from game.services.lobby import LobbyService
+from game.spectators import spectator_feed
+from game.state import game_states
+from game.write_behind import write_behind_queue
 from managers import game_ws_manager, lobby_ws_manager
-from schemas import ErrorEventDTO
+from schemas import ErrorEventDTO, ResponseDTO
+from sharding import forward_request, forward_websocket, shard_router
+from unitofwork import IUnitOfWork, UnitOfWork
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/games", tags=["Game"])
 ws_router = APIRouter(prefix="/ws/games", tags=["WS Game"])
@@ -32,6 +58,46 @@ async def create_lobby(
     return await LobbyService(uow).create_lobby(user)
 
 
+@router.post("/{game_id}/bid-advice", response_model=ResponseDTO[BidAdviceDTO])
+async def get_bid_advice(
+    game_id: UUID,
+    request: BidAdviceRequestDTO,
+    http_request: Request,
+    user: AuthenticatedUserDep,
+    uow: UOWDep,
+) -> ResponseDTO[BidAdviceDTO] | Response:
+    if not shard_router.is_local(game_id):
+        return await forward_request(
+            http_request, shard_router.get_url(game_id, http_request.url.path)
+        )
+    try:
+        advice = await GameService(uow).get_bid_advice(game_id, request)
+    except GameTypeError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=e.message)
+    except ValueError as e:
+        raise HTTPException(status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ResponseDTO[BidAdviceDTO](data=advice)
+
+
+@router.get("/{game_id}/queue", response_model=ResponseDTO[GameQueueDTO])
+async def get_game_queue(
+    game_id: UUID,
+    request: Request,
+    user: AuthenticatedUserDep,
+) -> ResponseDTO[GameQueueDTO] | Response:
+    if not shard_router.is_local(game_id):
+        return await forward_request(
+            request, shard_router.get_url(game_id, request.url.path)
+        )
+    return ResponseDTO[GameQueueDTO](
+        data=GameQueueDTO(
+            game_id=game_id,
+            queue_depth=game_actors.get_queue_depth(game_id),
+            max_queue_size=game_actors.max_queue_size,
+        )
+    )
+
+
 @ws_router.websocket("/lobbies/{lobby_id}")
 async def lobby_ws(
     websocket: WebSocket,
@@ -39,11 +105,20 @@ async def lobby_ws(
     user: WSAuthenticatedUserDep,
     uow: UOWDep,
 ):
+    if not shard_router.is_local(lobby_id):
+        await websocket.accept()
+        await forward_websocket(
+            websocket, shard_router.get_url(lobby_id, websocket.url.path)
+        )
+        return
     await lobby_ws_manager.connect(websocket, user, lobby_id)
     try:
         while True:
             message = await websocket.receive_json()
+            lobby_ws_manager.touch(user.id)
             event = message.get("event")
+            if event == "pong":
+                continue
             if event == "ready":
                 await lobby_ws_manager.add_user_to_ready_list(
                     user.id, lobby_id
@@ -68,7 +143,7 @@ async def lobby_ws(
                     ),
                 )
     except WebSocketDisconnect:
-        await lobby_ws_manager.disconnect(user.id, lobby_id)
+        await lobby_ws_manager.disconnect(user.id, lobby_id, websocket)
 
 
 @ws_router.websocket("/{game_id}")
@@ -78,10 +153,20 @@ async def game_ws(
     user: WSAuthenticatedUserDep,
     uow: UOWDep,
 ):
+    if not shard_router.is_local(game_id):
+        await websocket.accept()
+        await forward_websocket(
+            websocket, shard_router.get_url(game_id, websocket.url.path)
+        )
+        return
     is_player = await GameService(uow).is_player(user.id, game_id)
     if is_player:
         await game_ws_manager.connect_player_to_game(websocket, user, game_id)
-        game_info = await GameService(uow).get_full_game_info(game_id)
+        frames = await GameService(uow).get_full_game_frames(game_id)
+        await game_ws_manager.send_frame_to_user(user.id, frames[user.id])
+        spectator_feed.record_frame(
+            game_id, frames[PUBLIC_VIEW], is_snapshot=True
+        )
     else:
         await game_ws_manager.connect_spectator_to_game(
             websocket, user, game_id
@@ -93,20 +178,15 @@ async def game_ws(
                 data=game_ws_manager.get_users(game_id, "spectators"),
             ),
         )
-        game_info = await GameService(uow).get_full_spectator_game_info(
-            game_id
-        )
-    await game_ws_manager.send_to_user(
-        user.id,
-        FullGameCardInfoEventDTO(
-            event="full_game_card_info",
-            data=game_info,
-        ),
-    )
+        for frame in spectator_feed.get_released(game_id):
+            await game_ws_manager.send_frame_to_user(user.id, frame)
     try:
         while True:
             message = await websocket.receive_json()
+            game_ws_manager.touch(user.id)
             event = message.get("event")
+            if event == "pong":
+                continue
             if not is_player:
                 await game_ws_manager.send_to_user(
                     user.id,
@@ -118,36 +198,24 @@ async def game_ws(
                     ),
                 )
                 continue
-            if event == "bid":
+            if event == "sync":
+                await _submit(
+                    user.id,
+                    game_id,
+                    lambda: _send_sync(uow, user.id, game_id),
+                )
+            elif event == "bid":
                 bid = message.get("bid", 0)
-                card_count = await GameService(
-                    uow
-                ).get_current_round_card_count(game_id)
-                if bid > card_count:
-                    await game_ws_manager.send_to_user(
-                        user.id,
-                        ErrorEventDTO(
-                            event="error",
-                            data={
-                                "message": "Bid must be less than or equal to the current max bid."
-                            },
-                        ),
-                    )
-                    continue
-                await GameService(uow).bid(user.id, game_id, bid)
-                await game_ws_manager.broadcast_to_all(
+                await _submit(
+                    user.id,
                     game_id,
-                    BidEventDTO(
-                        event="bid",
-                        data={"user_id": user.id, "bid": bid},
-                    ),
+                    lambda: _handle_bid(uow, user.id, game_id, bid),
                 )
             elif event == "move":
                 data = message.get("data", {})
                 try:
                     process_card = ProcessCardDTO(
-                        **data
-                        | {"owner_id": user.id, "round_id": game_info.round_id}
+                        **data | {"owner_id": user.id}
                     )
                 except ValidationError as e:
                     await game_ws_manager.send_to_user(
@@ -158,40 +226,10 @@ async def game_ws(
                         ),
                     )
                     continue
-                try:
-                    await GameService(uow).process_card(
-                        process_card,
-                        game_id,
-                    )
-                except GameIsFinishedError:
-                    await game_ws_manager.broadcast_to_all(
-                        game_id,
-                        FullGameCardInfoEventDTO(
-                            event="game_is_finished",
-                            data=await GameService(uow).get_full_game_info(
-                                game_id
-                            ),
-                        ),
-                    )
-                    continue
-                except Exception as e:
-                    await game_ws_manager.send_to_user(
-                        user.id,
-                        ErrorEventDTO(
-                            event="error",
-                            data={"message": str(e)},
-                        ),
-                    )
-                    raise
-                    continue
-                await game_ws_manager.broadcast_to_all(
+                await _submit(
+                    user.id,
                     game_id,
-                    FullGameCardInfoEventDTO(
-                        event="full_game_card_info",
-                        data=await GameService(uow).get_full_game_info(
-                            game_id
-                        ),
-                    ),
+                    lambda: _handle_move(uow, user.id, game_id, process_card),
                 )
             else:
                 await game_ws_manager.send_to_user(
@@ -201,9 +239,130 @@ async def game_ws(
                     ),
                 )
     except WebSocketDisconnect:
+        pass
+    finally:
         if is_player:
-            await game_ws_manager.disconnect_player_from_game(user.id, game_id)
+            await game_ws_manager.disconnect_player_from_game(
+                user.id, game_id, websocket
+            )
+            if not game_ws_manager.get_users(game_id, "players"):
+                game_actors.stop(game_id)
+                game_states.forget(game_id)
+                game_projection.discard(game_id)
         else:
             await game_ws_manager.disconnect_spectator_from_game(
-                user.id, game_id
+                user.id, game_id, websocket
             )
+        if not game_ws_manager.get_users(
+            game_id, "players"
+        ) and not game_ws_manager.get_users(game_id, "spectators"):
+            spectator_feed.discard(game_id)
+
+
+async def _submit(
+    user_id: UUID, game_id: UUID, command: Callable[[], Awaitable[None]]
+) -> None:
+    """
+    Run the command on the actor of the game, so commands of a game are
+    applied and published one at a time and in order.
+    """
+    try:
+        await game_actors.submit(game_id, command)
+    except GameIsBusyError as e:
+        await game_ws_manager.send_to_user(
+            user_id,
+            ErrorEventDTO(event="error", data={"message": e.message}),
+        )
+
+
+async def _send_sync(uow: IUnitOfWork, user_id: UUID, game_id: UUID) -> None:
+    frames = await GameService(uow).get_full_game_frames(game_id)
+    await game_ws_manager.send_frame_to_user(user_id, frames[user_id])
+
+
+async def _handle_bid(
+    uow: IUnitOfWork, user_id: UUID, game_id: UUID, bid: int
+) -> None:
+    card_count = await GameService(uow).get_current_round_card_count(game_id)
+    if bid > card_count:
+        await game_ws_manager.send_to_user(
+            user_id,
+            ErrorEventDTO(
+                event="error",
+                data={
+                    "message": "Bid must be less than or equal to the current max bid."
+                },
+            ),
+        )
+        return
+    try:
+        bid_event = await GameService(uow).bid(user_id, game_id, bid)
+    except InvalidMoveError as e:
+        await game_ws_manager.send_to_user(
+            user_id,
+            ErrorEventDTO(
+                event="error",
+                data={"message": e.message},
+            ),
+        )
+        return
+    await game_ws_manager.broadcast_to_players(game_id, bid_event)
+    spectator_feed.record(game_id, bid_event)
+
+
+async def _handle_move(
+    uow: IUnitOfWork,
+    user_id: UUID,
+    game_id: UUID,
+    process_card: ProcessCardDTO,
+) -> None:
+    try:
+        events = await GameService(uow).process_card(process_card, game_id)
+    except (GameIsFinishedError, InvalidMoveError) as e:
+        await game_ws_manager.send_to_user(
+            user_id,
+            ErrorEventDTO(
+                event="error",
+                data={"message": e.message},
+            ),
+        )
+        return
+    except Exception as e:
+        logger.exception("Move of user %s in game %s failed", user_id, game_id)
+        await game_ws_manager.send_to_user(
+            user_id,
+            ErrorEventDTO(
+                event="error",
+                data={"message": str(e)},
+            ),
+        )
+        return
+    for game_event in events:
+        await game_ws_manager.broadcast_to_players(game_id, game_event)
+        spectator_feed.record(game_id, game_event)
+    if events[-1].event == "round_ended":
+        await _send_snapshot(uow, game_id)
+
+
+async def _resync_game(game_id: UUID) -> None:
+    """
+    Send a new snapshot of the game after its writes were dropped, the
+    clients were already sent moves the database does not have.
+    """
+    if not game_ws_manager.get_users(game_id, "players"):
+        return
+    try:
+        await game_actors.submit(
+            game_id, lambda: _send_snapshot(UnitOfWork(), game_id)
+        )
+    except Exception:
+        logger.exception("Resync of game %s failed", game_id)
+
+
+async def _send_snapshot(uow: IUnitOfWork, game_id: UUID) -> None:
+    frames = await GameService(uow).get_full_game_frames(game_id)
+    await game_ws_manager.send_frames_to_players(game_id, frames)
+    spectator_feed.record_frame(game_id, frames[PUBLIC_VIEW], is_snapshot=True)
+
+
+write_behind_queue.on_failure = _resync_game
@@ -0,0 +1,72 @@
+from typing import Sequence
+
+from game import cards
+from game.cards import SuitLiteral
+from game.schemas import CardDTO
+
+
+def check_card_validity(
+    card: CardDTO,
+    hand: Sequence[CardDTO],
+    trick: Sequence[CardDTO],
+    trump_suit: SuitLiteral | None = None,
+) -> bool:
+    """
+    A card is valid if it is the first card of the trick, follows the lead
+    suit, is a trump, or the hand has neither lead suit nor trump cards.
+    """
+    return cards.is_playable(
+        cards.encode(card),
+        cards.to_mask(hand),
+        trick[0].suit if trick else None,
+        trump_suit,
+    )
+
+
+def get_trick_winner_index(
+    trick: Sequence[CardDTO],
+    trump_suit: SuitLiteral | None = None,
+) -> int:
+    """
+    Return the index of the winning card in the trick.
+
+    The trick is ordered by play, so the first card defines the lead suit.
+    """
+    indexes = [cards.encode(card) for card in trick]
+    winner = cards.get_winning_index(
+        sum(1 << index for index in indexes), trick[0].suit, trump_suit
+    )
+    return indexes.index(winner)
+
+
+def get_score_addition(bid: int | None, actual_bid: int) -> int:
+    bid = bid or 0
+    if actual_bid == bid and bid == 0:
+        return 5
+    if actual_bid == bid:
+        return actual_bid * 10
+    if actual_bid > bid:
+        return actual_bid
+    return (actual_bid - bid) * 10
+
+
+def get_elo_delta(score: int, max_score: int) -> int:
+    return round((score - max_score * 2 / 3) * 10)
+
+
+def generate_rounds(players_number: int) -> Sequence[str]:
+    max_card_per_player = 36 // players_number
+    rounds = ["1"] * players_number
+    rounds += [str(_) for _ in range(2, max_card_per_player)]
+    rounds += [str(max_card_per_player)] * players_number
+    rounds += [str(_) for _ in range(max_card_per_player - 1, 2 - 1, -1)]
+    rounds += ["1"] * players_number
+    rounds += ["BR"] * players_number  # Blind Round
+    rounds += ["NTR"] * players_number  # No Trumps Round
+    return rounds
+
+
+def get_cards_per_player(round_name: str, players_number: int) -> int:
+    if round_name.isnumeric():
+        return int(round_name)
+    return 36 // players_number
@@ -2,10 +2,15 @@ from datetime import datetime
 from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from auth.schemas import UserInfoDTO
 
+# Key of the spectators' view among the per-player snapshot frames.
+PublicViewLiteral = Literal["public"]
+PUBLIC_VIEW: PublicViewLiteral = "public"
+ViewerId = UUID | PublicViewLiteral
+
 
 class PlayersInSearchCountDTO(BaseModel):
     model_config = ConfigDict(populate_by_name=True)
@@ -60,8 +65,55 @@ class RoundInfoDTO(BaseModel):
     opening_player_id: UUID
 
 
-class UserCardListDTO(UserInfoDTO):
-    cards: list[CardDTO]
+class PlayerRatingDTO(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: UUID
+    score: int
+
+
+class RoundDealDTO(BaseModel):
+    hands: list[list[CardDTO]]
+    trump_suit: Literal["H", "D", "C", "S"] | None = None
+    trump_value: int | None = None
+
+
+class SimulationResultDTO(BaseModel):
+    scores: list[int]
+    elo_deltas: list[int]
+    winners: list[int]
+
+
+class GameQueueDTO(BaseModel):
+    game_id: UUID
+    queue_depth: int
+    max_queue_size: int
+
+
+class BidAdviceRequestDTO(BaseModel):
+    hand: list[CardDTO] = Field(min_length=1, max_length=36)
+    trump_suit: Literal["H", "D", "C", "S"] | None = None
+    trump_value: int | None = None
+    seat: int = Field(
+        default=0, ge=0, description="Position in the turn order"
+    )
+    samples: int = Field(default=10_000, ge=100, le=100_000)
+
+    @model_validator(mode="after")
+    def cards_are_unique(self) -> "BidAdviceRequestDTO":
+        cards = {(card.suit, card.value) for card in self.hand}
+        if len(cards) != len(self.hand):
+            raise ValueError("The hand has repeated cards")
+        if (self.trump_suit, self.trump_value) in cards:
+            raise ValueError("The trump card is in the hand")
+        return self
+
+
+class BidAdviceDTO(BaseModel):
+    distribution: list[float]
+    expected_tricks: float
+    recommended_bid: int
+    samples: int
 
 
 class FullCardInfoDTO(BaseModel):
@@ -77,27 +129,30 @@ class FullUserCardInfoDTO(UserInfoDTO):
     actual_bid: int | None = None
     score: int | None = None
     cards: list[FullCardInfoDTO]
+    cards_count: int | None = None
 
 
-class FlattenFullGameCardInfoDTO(BaseModel):
+class PlayerSnapshotDTO(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     round_id: UUID
+    round_name: str
+    round_number: int | None = None
+    trump_suit: Literal["H", "D", "C", "S"] | None = None
+    trump_value: int | None = None
+    opening_player_id: UUID
     user_id: UUID
     username: str
     email: str
     elo: int
     created_at: datetime
-    card_id: UUID
-    suit: Literal["H", "D", "C", "S"]
-    value: int
-    entry_id: UUID | None = None
-    trump_suit: Literal["H", "D", "C", "S"] | None = None
-    trump_value: int | None = None
-    opening_player_id: UUID
+    position: int | None = None
+    total_score: int = 0
     bid: int | None = None
     actual_bid: int | None = None
     score: int | None = None
+    hand: list[FullCardInfoDTO] = []
+    trick: list[FullCardInfoDTO] = []
 
 
 class FullEntryCardInfoDTO(BaseModel):
@@ -118,14 +173,15 @@ class FullGameCardInfoDTO(BaseModel):
 class ProcessCardDTO(BaseModel):
     card_id: UUID
     owner_id: UUID
-    round_id: UUID
-    is_round_end: bool = False
 
 
-class EntryIdDTO(BaseModel):
-    model_config = ConfigDict(from_attributes=True)
-
-    id: UUID
+class MoveResultDTO(BaseModel):
+    card: FullCardInfoDTO
+    entry_id: UUID
+    owner_id: UUID
+    is_new_entry: bool = False
+    is_trick_finished: bool = False
+    is_round_finished: bool = False
 
 
 class GameIdPayloadDTO(BaseModel):
@@ -139,6 +195,7 @@ class GameStartEventDTO(BaseModel):
 
 class FullGameCardInfoEventDTO(BaseModel):
     event: Literal["full_game_card_info", "game_is_finished"]
+    seq: int = 0
     data: FullGameCardInfoDTO
 
 
@@ -147,6 +204,87 @@ class NewWatcherEventDTO(BaseModel):
     data: list[UserInfoDTO]
 
 
-class BidEventDTO(BaseModel):
-    event: Literal["bid"]
-    data: dict[str, UUID | int]
+class CardPlayedPayloadDTO(BaseModel):
+    card: FullCardInfoDTO
+    owner_id: UUID
+
+
+class CardPlayedEventDTO(BaseModel):
+    event: Literal["card_played"]
+    seq: int
+    data: CardPlayedPayloadDTO
+
+
+class TrickWonPayloadDTO(BaseModel):
+    entry_id: UUID
+    user_id: UUID
+    tricks_taken: int
+
+
+class TrickWonEventDTO(BaseModel):
+    event: Literal["trick_won"]
+    seq: int
+    data: TrickWonPayloadDTO
+
+
+class RoundResultDTO(BaseModel):
+    user_id: UUID
+    bid: int | None = None
+    actual_bid: int
+    score: int
+
+
+class RoundEndedPayloadDTO(BaseModel):
+    round_id: UUID
+    results: list[RoundResultDTO]
+
+
+class RoundEndedEventDTO(BaseModel):
+    event: Literal["round_ended"]
+    seq: int
+    data: RoundEndedPayloadDTO
+
+
+class BidPlacedPayloadDTO(BaseModel):
+    user_id: UUID
+    bid: int
+
+
+class BidPlacedEventDTO(BaseModel):
+    event: Literal["bid_placed"]
+    seq: int
+    data: BidPlacedPayloadDTO
+
+
+GameEventDTO = (
+    CardPlayedEventDTO
+    | TrickWonEventDTO
+    | RoundEndedEventDTO
+    | BidPlacedEventDTO
+)
+
+
+class GameStateSnapshotDTO(BaseModel):
+    game_id: UUID
+    round_id: UUID
+    round_name: str
+    round_number: int | None = None
+    trump_suit: Literal["H", "D", "C", "S"] | None = None
+    trump_value: int | None = None
+    opening_player_id: UUID
+    players: list[UserInfoDTO]
+    hands: dict[UUID, list[FullCardInfoDTO]]
+    bids: dict[UUID, int | None]
+    tricks_taken: dict[UUID, int]
+    scores: dict[UUID, int]
+    trick: list[FullCardInfoDTO]
+    entry_id: UUID | None = None
+    leader_id: UUID
+
+
+class GameSnapshotDTO(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    round_id: UUID
+    seq: int
+    payload: GameStateSnapshotDTO
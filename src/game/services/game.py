@@ -1,162 +1,125 @@
 import asyncio
-import random
+import logging
+from collections import Counter
 from datetime import UTC, datetime
-from typing import Generator, Literal, Sequence
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from auth.schemas import UserInfoDTO
-from game.exceptions import GameIsFinishedError
-from game.models import Suit
+from game import advisor, rules
+from game.dealer import Dealer
+from game.exceptions import (
+    GameIsFinishedError,
+    GameTypeError,
+    InvalidMoveError,
+)
+from game.models import GameType
+from game.projections import SnapshotEventLiteral, game_projection
 from game.schemas import (
-    CardDTO,
-    FullCardInfoDTO,
-    FullEntryCardInfoDTO,
-    FullGameCardInfoDTO,
-    FullUserCardInfoDTO,
+    BidAdviceDTO,
+    BidAdviceRequestDTO,
+    BidPlacedEventDTO,
+    BidPlacedPayloadDTO,
+    CardPlayedEventDTO,
+    CardPlayedPayloadDTO,
+    GameEventDTO,
     GameInfoDTO,
+    MoveResultDTO,
     ProcessCardDTO,
-    UserCardDTO,
-    UserCardListDTO,
+    RoundEndedEventDTO,
+    RoundEndedPayloadDTO,
+    RoundResultDTO,
+    TrickWonEventDTO,
+    TrickWonPayloadDTO,
+    ViewerId,
 )
+from game.state import GameState, game_states
+from game.write_behind import WriteOp, write_behind_queue
 from unitofwork import IUnitOfWork
 
-CARDS = {
-    CardDTO(suit=member.value, value=value)
-    for value in range(6, 15)
-    for member in Suit
-}
+logger = logging.getLogger(__name__)
 
 
 class GameService:
+    snapshot_interval = 50
+
     def __init__(self, uow: IUnitOfWork) -> None:
         self._uow: IUnitOfWork = uow
 
-    async def process_card(self, card: ProcessCardDTO, game_id: UUID) -> None:
-        async with self._uow:
-            dealing = await self._uow.dealings.get(
-                round_id=card.round_id,
-                user_id=card.owner_id,
-            )
-            entry = await self._uow.entries.get_or_create(
-                round_id=card.round_id,
-                owner_id=card.owner_id,
-            )
-            dealing_cards = await self._uow.cards.get_cards_by_dealing_id(
-                dealing_id=dealing.id,
-            )
-            entry_cards = await self._uow.cards.get_cards_by_entry_id(
-                entry_id=entry.id,
-            )
-            card_orm = await self._uow.cards.get(
-                id=card.card_id,
-            )
-            current_card = UserCardDTO(
-                suit=card_orm.suit.value,
-                value=card_orm.value,
-                id=card_orm.id,
-                user_id=card.owner_id,
-                entry_id=entry.id,
-            )
-            round_ = await self._uow.rounds.get(
-                id=card.round_id,
-            )
-            self._check_card_validity(
-                card=current_card,
-                dealing_cards=dealing_cards,
-                entry_cards=entry_cards,
-                trump_suit=round_.trump_suit,
-            )
-            await self._uow.cards.update(
-                {"id": card.card_id},
-                entry_id=entry.id,
-            )
-            owner_id = self._get_new_owner_id(
-                card=current_card,
-                entry_cards=entry_cards,
-                trump_suit=round_.trump_suit,
-            )
-            await self._uow.entries.update(
-                {"round_id": card.round_id},
-                owner_id=owner_id,
-            )
-            if card.is_round_end:
-                try:
-                    await self._actualize_round(game_id, round_.id)
-                    await self._uow.rounds.make_new_current(
-                        game_id, card.round_id
-                    )
-                except GameIsFinishedError:
-                    await self._finish_game(game_id, round_.id)
-                    await self._uow.commit()
-                    raise
-            await self._uow.commit()
+    async def process_card(
+        self, card: ProcessCardDTO, game_id: UUID
+    ) -> list[GameEventDTO]:
+        """
+        Apply the move and return the events it produced, in order.
 
-    async def get_full_game_info(self, game_id: UUID) -> FullGameCardInfoDTO:
-        flatten_info_list = await self._uow.games.get_full_game_info(game_id)
-        user_cards = []
-        entry_cards = []
-        for info in flatten_info_list:
-            card = FullCardInfoDTO(
-                id=info.card_id,
-                suit=info.suit,
-                value=info.value,
-                user_id=info.user_id,
-                entry_id=info.entry_id,
-            )
-            if info.entry_id is None:
-                user_cards.append(card)
-            else:
-                entry_cards.append(card)
-        user_ids = {user.user_id for user in flatten_info_list}
-        return FullGameCardInfoDTO(
-            round_id=flatten_info_list[0].round_id,
-            users=[
-                FullUserCardInfoDTO(
-                    id=info.user_id,
-                    username=info.username,
-                    email=info.email,
-                    elo=info.elo,
-                    created_at=info.created_at,
-                    bid=info.bid,
-                    actual_bid=info.actual_bid,
-                    score=info.score,
-                    cards=[
-                        card
-                        for card in user_cards
-                        if card.user_id == info.user_id
-                    ],
-                )
-                for info in flatten_info_list
-                if info.user_id in user_ids
-            ],
-            entry=FullEntryCardInfoDTO(
-                id=entry_cards[0].entry_id,
-                cards=entry_cards,
-            )
-            if entry_cards
-            else None,
-            trump_suit=flatten_info_list[0].trump_suit,
-            trump_value=flatten_info_list[0].trump_value,
+        The events are returned also when the move finishes the game, the
+        next snapshot of the game is then a ``game_is_finished`` one.
+        """
+        state = await self._get_state(game_id)
+        result = state.play_card(card.owner_id, card.card_id)
+        write_behind_queue.push(
+            game_id, *self._get_move_writes(state.round_id, result)
+        )
+        events = self._get_move_events(game_id, state, result)
+        write_behind_queue.push(
+            game_id, *self._get_log_writes(game_id, state, events)
         )
+        if result.is_round_finished:
+            write_behind_queue.push(game_id, self._get_round_write(state))
+            try:
+                await self._switch_round(game_id, state)
+            except GameIsFinishedError:
+                pass
+        return events
+
+    async def get_full_game_frames(
+        self,
+        game_id: UUID,
+        event: SnapshotEventLiteral = "full_game_card_info",
+    ) -> dict[ViewerId, str]:
+        """
+        Build serialized snapshot events of the game, one per player and
+        one public under the ``PUBLIC_VIEW`` key.
 
-    async def get_full_spectator_game_info(
-        self, game_id: UUID
-    ) -> FullGameCardInfoDTO:
-        await asyncio.sleep(60 * 5)
-        return await self.get_full_game_info(game_id)
+        Snapshots do not take a sequence number of their own, they are
+        stamped with the one of the last logged event, so the receiver can
+        apply the following events on top of it and every number sent to
+        clients is in the event log. The snapshot of a finished game is
+        always a ``game_is_finished`` event.
+        """
+        state = await self._get_state(game_id)
+        if state.is_finished:
+            event = "game_is_finished"
+        return game_projection.get_frames(
+            state, event, game_states.get_sequence(game_id)
+        )
 
-    async def create_game(self, players: list[UserInfoDTO]) -> GameInfoDTO:
+    async def create_game(
+        self, players: list[UserInfoDTO], seed: int | None = None
+    ) -> GameInfoDTO:
+        card_dealer = Dealer(seed)
         async with self._uow:
             game = await self._uow.games.add(
                 type="MULTIPLAYER",
                 players_number=len(players),
+                seed=card_dealer.seed,
+            )
+            await self._uow.game_players.bulk_add(
+                [
+                    {
+                        "game_id": game.id,
+                        "user_id": player.id,
+                        "position": position,
+                    }
+                    for position, player in enumerate(players)
+                ]
+            )
+            await self.create_round_with_cards(
+                game.id,
+                [player.id for player in players],
+                card_dealer,
+                round_number=1,
+                is_current_round=True,
             )
-            for player in players:
-                await self._uow.game_players.add(
-                    game_id=game.id,
-                    user_id=player.id,
-                )
-            await self.create_rounds_with_cards(game.id, players)
             await self._uow.commit()
         return GameInfoDTO(
             id=game.id,
@@ -164,254 +127,453 @@ class GameService:
             created_at=game.created_at,
         )
 
-    async def create_rounds_with_cards(
+    async def create_round_with_cards(
         self,
         game_id: UUID,
-        players: list[UserInfoDTO],
+        seats: list[UUID],
+        card_dealer: Dealer,
+        round_number: int,
+        is_current_round: bool = False,
     ) -> None:
-        circular_players_generator = self._get_circular_iterations(players)
-        dealer = next(circular_players_generator)
-        opening_player = next(circular_players_generator)
-        is_current_round = True
-        for index, round_name in enumerate(
-            self._generate_rounds(len(players))
-        ):
-            users_with_cards, used_cards = self._generate_cards_for_round(
-                round_name, players
+        """
+        Deal one round of the game and insert it
+        with one multi-row insert per table.
+
+        Rounds are dealt on demand, the dealer and the opening player
+        move one seat to the left every round.
+        """
+        round_name = rules.generate_rounds(len(seats))[round_number - 1]
+        first_dealer = card_dealer.pick_first_dealer(len(seats))
+        dealer_id = seats[(first_dealer + round_number - 1) % len(seats)]
+        opening_player_id = seats[(first_dealer + round_number) % len(seats)]
+        deal = card_dealer.deal(round_number, round_name, len(seats))
+        round_id = uuid4()
+        dealings: list[dict[str, str | int | UUID | None]] = []
+        cards: list[dict[str, str | int | UUID | None]] = []
+        for user_id, hand in zip(seats, deal.hands):
+            dealing_id = uuid4()
+            dealings.append(
+                {
+                    "id": dealing_id,
+                    "user_id": user_id,
+                    "round_id": round_id,
+                    "bid": None,
+                    "actual_bid": None,
+                    "score": 0,
+                }
             )
-            trump_suit, trump_value = self._pick_trump(round_name, used_cards)
-            round_obj = await self._uow.rounds.add(
-                trump_suit=trump_suit,
-                trump_value=trump_value,
-                round_name=round_name,
-                round_number=index + 1,
-                is_current_round=is_current_round,
-                dealer_id=dealer.id,
-                opening_player_id=opening_player.id,
-                game_id=game_id,
+            cards.extend(
+                {
+                    "id": uuid4(),
+                    "dealing_id": dealing_id,
+                    "suit": card.suit,
+                    "value": card.value,
+                    "entry_id": None,
+                }
+                for card in hand
             )
-            is_current_round = False
-            for user in users_with_cards:
-                dealing = await self._uow.dealings.add(
-                    user_id=user.id, round_id=round_obj.id, score=0
-                )
-                for card in user.cards:
-                    await self._uow.cards.add(
-                        dealing_id=dealing.id,
-                        suit=card.suit,
-                        value=card.value,
-                    )
-            dealer = opening_player
-            opening_player = next(circular_players_generator)
+        await self._uow.rounds.bulk_add(
+            [
+                {
+                    "id": round_id,
+                    "trump_suit": deal.trump_suit,
+                    "trump_value": deal.trump_value,
+                    "round_name": round_name,
+                    "round_number": round_number,
+                    "is_current_round": is_current_round,
+                    "dealer_id": dealer_id,
+                    "opening_player_id": opening_player_id,
+                    "game_id": game_id,
+                }
+            ]
+        )
+        await self._uow.dealings.bulk_add(dealings)
+        await self._uow.cards.bulk_add(cards)
 
     async def is_player(self, user_id: UUID, game_id: UUID) -> bool:
         async with self._uow:
             return await self._uow.game_players.is_player(user_id, game_id)
 
-    async def get_current_round_card_count(self, game_id: UUID) -> int:
-        async with self._uow:
-            game_info = await self.get_full_game_info(game_id)
-        card_count = 0
-        for user in game_info.users:
-            card_count += len(user.cards)
-        if game_info.entry:
-            card_count += len(game_info.entry.cards)
-        return card_count / len(game_info.users)
-
-    async def bid(self, user_id: UUID, game_id: UUID, bid: int) -> None:
+    async def get_bid_advice(
+        self, game_id: UUID, request: BidAdviceRequestDTO
+    ) -> BidAdviceDTO:
         async with self._uow:
-            current_round = await self._uow.rounds.get_current_round(game_id)
-            current_dealing = await self._uow.dealings.get_current_dealing(
-                current_round.id, user_id
+            game = await self._uow.games.get(
+                returns=("type", "players_number"), id=game_id
+            )
+        if game is None or game.type != GameType.ANALYSIS:
+            raise GameTypeError(
+                "Bid advice is only available for analysis games."
             )
-            await self._uow.dealings.update(
-                {"id": current_dealing.id},
+        return await asyncio.to_thread(
+            advisor.estimate_tricks,
+            request.hand,
+            request.trump_suit,
+            request.seat,
+            game.players_number,
+            request.samples,
+            trump_value=request.trump_value,
+        )
+
+    async def get_current_round_card_count(self, game_id: UUID) -> int:
+        state = await self._get_state(game_id)
+        return state.cards_per_player
+
+    async def bid(
+        self, user_id: UUID, game_id: UUID, bid: int
+    ) -> BidPlacedEventDTO:
+        state = await self._get_state(game_id)
+        state.place_bid(user_id, bid)
+        round_id = state.round_id
+
+        async def update_bid(uow: IUnitOfWork) -> None:
+            await uow.dealings.update(
+                {"round_id": round_id, "user_id": user_id},
                 bid=bid,
             )
-            await self._uow.commit()
 
-    async def _finish_game(self, game_id: UUID, round_id: UUID) -> None:
-        await self._uow.games.update(
-            {"id": game_id},
-            is_finished=True,
-            finished_at=datetime.now(UTC),
+        event = BidPlacedEventDTO(
+            event="bid_placed",
+            seq=game_states.next_sequence(game_id),
+            data=BidPlacedPayloadDTO(user_id=user_id, bid=bid),
         )
-        await self._update_ratings(game_id, round_id)
-
-    async def _update_ratings(self, game_id: UUID, round_id: UUID) -> None:
-        dealings = await self._uow.dealings.get_all(round_id=round_id)
-        max_score: int | None = None
-        for dealing in dealings:
-            if max_score is None or dealing.score > max_score:
-                max_score = dealing.score
-        for dealing in dealings:
-            if dealing.score == max_score:
-                await self._uow.game_winners.add(
-                    game_id=game_id,
-                    user_id=dealing.user_id,
-                )
-        for dealing in dealings:
-            user = await self._uow.users.get(id=dealing.user_id)
-            new_elo = user.elo + (dealing.score - max_score * 2 / 3) * 10
-            await self._uow.users.update(
-                {"id": user.id},
-                elo=new_elo,
-            )
+        write_behind_queue.push(
+            game_id,
+            update_bid,
+            *self._get_log_writes(game_id, state, [event]),
+        )
+        return event
 
-    @staticmethod
-    def _check_card_validity(
-        card: UserCardDTO,
-        dealing_cards: list[CardDTO],
-        entry_cards: list[CardDTO],
-        trump_suit: Literal["H", "D", "C", "S"] | None = None,
-    ) -> bool:
-        try:
-            first_card = entry_cards[0]
-        except IndexError:
-            return True
-        if card.suit != first_card.suit and card.suit != trump_suit:
-            is_valid = True
-            for dealing_card in dealing_cards:
-                if (
-                    dealing_card.suit == first_card.suit
-                    or dealing_card.suit == trump_suit
-                ):
-                    is_valid = False
-                    break
-            return is_valid
-        return True
+    async def _get_state(self, game_id: UUID) -> GameState:
+        return await game_states.get_or_load(
+            game_id, lambda: self._load_state(game_id)
+        )
 
-    @staticmethod
-    def _get_new_owner_id(
-        card: UserCardDTO,
-        entry_cards: list[CardDTO],
-        trump_suit: Literal["H", "D", "C", "S"] | None = None,
-    ) -> UUID:
-        if not entry_cards:
-            return card.user_id
-        owner_card = card
-        for entry_card in entry_cards:
-            if (
-                entry_card.suit == owner_card.suit
-                and entry_card.value > owner_card.value
-            ):
-                owner_card = entry_card
-            elif (
-                entry_card.suit == trump_suit and owner_card.suit != trump_suit
-            ):
-                owner_card = entry_card
-            elif (
-                entry_card.suit == trump_suit and owner_card.suit == trump_suit
-            ):
-                if entry_card.value > owner_card.value:
-                    owner_card = entry_card
-        return owner_card.user_id
-
-    async def _actualize_round(self, game_id: UUID, round_id: UUID) -> None:
-        entries = await self._uow.entries.get_all(round_id=round_id)
-        dealings = await self._uow.dealings.get_all(round_id=round_id)
-        user_bid_map = {}
-        for entry in entries:
-            if entry.owner_id in user_bid_map:
-                user_bid_map[entry.owner_id] += 1
-            else:
-                user_bid_map[entry.owner_id] = 1
-        for dealing in dealings:
-            if dealing.user_id in user_bid_map:
-                actual_bid = user_bid_map[dealing.user_id]
-            else:
-                actual_bid = 0
-            if actual_bid == dealing.bid and dealing.bid == 0:
-                score_addition = 5
-            elif actual_bid == dealing.bid:
-                score_addition = actual_bid * 10
-            elif actual_bid > dealing.bid:
-                score_addition = actual_bid
-            else:
-                score_addition = (actual_bid - dealing.bid) * 10
-            previous_round = await self._uow.rounds.get_previous_round(game_id)
-            if previous_round is None:
-                old_score = 0
-            else:
-                old_dealing = await self._uow.dealings.get(
-                    round_id=previous_round.id,
-                    user_id=dealing.user_id,
+    async def _load_state(self, game_id: UUID) -> GameState:
+        """
+        Rebuild the state from the last snapshot of the current round and
+        the events logged after it. Without such a snapshot the state is
+        built from the game tables and a snapshot of it is stored.
+        """
+        await write_behind_queue.flush(game_id)
+        async with self._uow:
+            current_round = await self._uow.rounds.get_current_round(game_id)
+            if current_round is None:
+                raise GameIsFinishedError
+            snapshot = await self._uow.game_snapshots.get_latest(game_id)
+            if snapshot is not None and snapshot.round_id == current_round.id:
+                events = await self._uow.game_events.get_tail(
+                    game_id, snapshot.seq
                 )
-                old_score = old_dealing.score if old_dealing else 0
-                old_score = old_score if old_score is not None else 0
-            score = old_score + score_addition
-            await self._uow.dealings.update(
-                {"id": dealing.id},
-                actual_bid=actual_bid,
-                score=score,
+                try:
+                    state = GameState.from_snapshot(snapshot.payload)
+                    for event in events:
+                        state.apply_event(event)
+                except InvalidMoveError:
+                    logger.warning(
+                        "Event log replay failed for game %s", game_id
+                    )
+                else:
+                    game_states.set_sequence(
+                        game_id, events[-1].seq if events else snapshot.seq
+                    )
+                    return state
+            state = await self._build_state(game_id)
+            seq = await self._uow.game_events.get_last_seq(game_id)
+            if snapshot is not None:
+                seq = max(seq, snapshot.seq)
+            await self._uow.game_snapshots.add(
+                game_id=game_id,
+                round_id=state.round_id,
+                seq=seq,
+                payload=state.to_snapshot().model_dump(mode="json"),
             )
+            await self._uow.commit()
+        game_states.set_sequence(game_id, seq)
+        return state
 
-    @staticmethod
-    def _generate_cards_for_round(
-        round_name: str, players: list[UserInfoDTO]
-    ) -> tuple[list[UserCardListDTO], set[CardDTO]]:
-        max_cards_per_player = (
-            int(round_name) if round_name.isnumeric() else 36 // len(players)
+    async def _build_state(self, game_id: UUID) -> GameState:
+        players = await self._uow.games.get_game_snapshot(game_id)
+        if not players:
+            raise GameIsFinishedError
+        current_round = players[0]
+        entries = await self._uow.entries.get_all(
+            round_id=current_round.round_id
+        )
+        seats = [player.user_id for player in players]
+        finished_entries = sorted(
+            (entry for entry in entries if entry.is_finished),
+            key=lambda entry: entry.finished_at,
+        )
+        open_entry = next(
+            (entry for entry in entries if not entry.is_finished), None
         )
-        users_with_cards: list[UserCardListDTO] = []
-        used_cards: set[CardDTO] = set()
-        for player in players:
-            cards: list[CardDTO] = []
-            for _ in range(max_cards_per_player):
-                card: CardDTO = random.choice(list(CARDS - used_cards))
-                cards.append(card)
-                used_cards.add(card)
-            users_with_cards.append(
-                UserCardListDTO(
-                    id=player.id,
+        leader_id = (
+            finished_entries[-1].owner_id
+            if finished_entries
+            else current_round.opening_player_id
+        )
+        leader_seat = seats.index(leader_id)
+        trick = sorted(
+            (card for player in players for card in player.trick),
+            key=lambda card: (seats.index(card.user_id) - leader_seat)
+            % len(seats),
+        )
+        return GameState(
+            game_id=game_id,
+            round_id=current_round.round_id,
+            round_name=current_round.round_name,
+            round_number=current_round.round_number,
+            trump_suit=current_round.trump_suit,
+            trump_value=current_round.trump_value,
+            opening_player_id=current_round.opening_player_id,
+            players=[
+                UserInfoDTO(
+                    id=player.user_id,
                     username=player.username,
                     email=player.email,
                     elo=player.elo,
                     created_at=player.created_at,
-                    cards=cards,
                 )
-            )
-        return users_with_cards, used_cards
+                for player in players
+            ],
+            hands={player.user_id: player.hand for player in players},
+            bids={player.user_id: player.bid for player in players},
+            tricks_taken=Counter(entry.owner_id for entry in finished_entries),
+            scores={player.user_id: player.total_score for player in players},
+            trick=trick,
+            entry_id=open_entry.id if open_entry is not None else None,
+            leader_id=leader_id,
+        )
 
     @staticmethod
-    def _generate_rounds(players_number: int) -> Sequence[str]:
-        max_card_per_player = 36 // players_number
-        rounds = ["1"] * players_number
-        rounds += [str(_) for _ in range(2, max_card_per_player)]
-        rounds += [str(max_card_per_player)] * players_number
-        rounds += [str(_) for _ in range(max_card_per_player - 1, 2 - 1, -1)]
-        rounds += ["1"] * players_number
-        rounds += ["BR"] * players_number  # Blind Round
-        rounds += ["NTR"] * players_number  # No Trumps Round
-        return rounds
+    def _get_move_writes(
+        round_id: UUID, result: MoveResultDTO
+    ) -> list[WriteOp]:
+        card_id = result.card.id
+        entry_id = result.entry_id
+        owner_id = result.owner_id
+        is_trick_finished = result.is_trick_finished
+        writes: list[WriteOp] = []
+
+        async def add_entry(uow: IUnitOfWork) -> None:
+            await uow.entries.add(
+                id=entry_id, round_id=round_id, owner_id=owner_id
+            )
+
+        async def update_card(uow: IUnitOfWork) -> None:
+            await uow.cards.update({"id": card_id}, entry_id=entry_id)
+
+        async def update_entry(uow: IUnitOfWork) -> None:
+            await uow.entries.update(
+                {"id": entry_id},
+                owner_id=owner_id,
+                is_finished=is_trick_finished,
+                finished_at=datetime.utcnow() if is_trick_finished else None,
+            )
+
+        if result.is_new_entry:
+            writes.append(add_entry)
+        writes.append(update_card)
+        writes.append(update_entry)
+        return writes
 
     @staticmethod
-    def _get_circular_iterations(
-        start_list: list[UserInfoDTO],
-    ) -> Generator[UserInfoDTO, None, None]:
+    def _get_round_write(state: GameState) -> WriteOp:
+        game_id = state.game_id
+        round_id = state.round_id
+        tricks_taken = dict(state.tricks_taken)
+        scores = dict(state.scores)
+
+        async def update_scores(uow: IUnitOfWork) -> None:
+            await uow.dealings.bulk_update(
+                [
+                    {
+                        "user_id": user_id,
+                        "actual_bid": tricks_taken[user_id],
+                        "score": score,
+                    }
+                    for user_id, score in scores.items()
+                ],
+                keys=("user_id",),
+                round_id=round_id,
+            )
+            await uow.game_players.bulk_update(
+                [
+                    {"user_id": user_id, "score": score}
+                    for user_id, score in scores.items()
+                ],
+                keys=("user_id",),
+                game_id=game_id,
+            )
+
+        return update_scores
+
+    def _get_log_writes(
+        self, game_id: UUID, state: GameState, events: list[GameEventDTO]
+    ) -> list[WriteOp]:
         """
-        Iterates through start_list circularly, starting from a random element,
-        and yields elements for each item in control_list.
+        Append the events to the game log and store a snapshot of the state
+        every ``snapshot_interval`` events, so recovery replays a short tail.
         """
-        start_index = random.randint(0, len(start_list) - 1)
+        inserts = [
+            {
+                "game_id": game_id,
+                "seq": event.seq,
+                "type": event.event,
+                "payload": event.data.model_dump(mode="json"),
+            }
+            for event in events
+        ]
+
+        async def add_events(uow: IUnitOfWork) -> None:
+            await uow.game_events.bulk_add(inserts)
+
+        writes: list[WriteOp] = [add_events]
+        first_seq, last_seq = events[0].seq, events[-1].seq
+        if (
+            not state.is_round_finished
+            and last_seq // self.snapshot_interval
+            > (first_seq - 1) // self.snapshot_interval
+        ):
+            snapshot = {
+                "game_id": game_id,
+                "round_id": state.round_id,
+                "seq": last_seq,
+                "payload": state.to_snapshot().model_dump(mode="json"),
+            }
+
+            async def add_snapshot(uow: IUnitOfWork) -> None:
+                await uow.game_snapshots.add(**snapshot)
 
-        while True:
-            for i in range(start_index, len(start_list)):
-                yield start_list[i]
-            for i in range(0, start_index):
-                yield start_list[i]
+            writes.append(add_snapshot)
+        return writes
 
     @staticmethod
-    def _pick_trump(
-        round_name: str, used_cards: set[CardDTO]
-    ) -> tuple[Literal["H", "D", "C", "S"] | None, int | None]:
-        unused_cards = CARDS - used_cards
-        if not unused_cards:
-            return random.choice(["H", "D", "C", "S"]), None
-        trump_card: CardDTO = random.choice(list(unused_cards))
-        trump_suit = trump_card.suit
-        trump_value = trump_card.value
-        if round_name == "NTR" or (trump_suit == "S" and trump_value == 7):
-            trump_suit = None
-            trump_value = None
-        return trump_suit, trump_value
+    def _get_move_events(
+        game_id: UUID, state: GameState, result: MoveResultDTO
+    ) -> list[GameEventDTO]:
+        events: list[GameEventDTO] = [
+            CardPlayedEventDTO(
+                event="card_played",
+                seq=game_states.next_sequence(game_id),
+                data=CardPlayedPayloadDTO(
+                    card=result.card, owner_id=result.owner_id
+                ),
+            )
+        ]
+        if result.is_trick_finished:
+            events.append(
+                TrickWonEventDTO(
+                    event="trick_won",
+                    seq=game_states.next_sequence(game_id),
+                    data=TrickWonPayloadDTO(
+                        entry_id=result.entry_id,
+                        user_id=result.owner_id,
+                        tricks_taken=state.tricks_taken[result.owner_id],
+                    ),
+                )
+            )
+        if result.is_round_finished:
+            events.append(
+                RoundEndedEventDTO(
+                    event="round_ended",
+                    seq=game_states.next_sequence(game_id),
+                    data=RoundEndedPayloadDTO(
+                        round_id=state.round_id,
+                        results=[
+                            RoundResultDTO(
+                                user_id=user_id,
+                                bid=state.bids[user_id],
+                                actual_bid=state.tricks_taken[user_id],
+                                score=state.scores[user_id],
+                            )
+                            for user_id in state.seats
+                        ],
+                    ),
+                )
+            )
+        return events
+
+    async def _switch_round(self, game_id: UUID, state: GameState) -> None:
+        """
+        Make the next round current, the state of the finished round is
+        discarded whatever happens. Only the state of a finished game is
+        kept, to send its final snapshot.
+        """
+        try:
+            await write_behind_queue.flush(game_id)
+            async with self._uow:
+                await self._prepare_next_round(game_id, state)
+                try:
+                    await self._uow.rounds.make_new_current(
+                        game_id, state.round_id
+                    )
+                except GameIsFinishedError:
+                    await self._finish_game(game_id)
+                    await self._uow.commit()
+                    state.is_finished = True
+                    raise
+                await self._uow.commit()
+        except GameIsFinishedError:
+            if not state.is_finished:
+                game_states.discard(game_id)
+            raise
+        except BaseException:
+            game_states.discard(game_id)
+            raise
+        game_states.discard(game_id)
+
+    async def _prepare_next_round(
+        self, game_id: UUID, state: GameState
+    ) -> None:
+        next_round_number = (state.round_number or 0) + 1
+        if next_round_number > len(rules.generate_rounds(len(state.seats))):
+            return
+        next_round = await self._uow.rounds.get_all(
+            returns=("id",), game_id=game_id, round_number=next_round_number
+        )
+        if next_round:
+            return
+        game = await self._uow.games.get(returns=("seed",), id=game_id)
+        await self.create_round_with_cards(
+            game_id, state.seats, Dealer(game.seed), next_round_number
+        )
+
+    async def _finish_game(self, game_id: UUID) -> None:
+        await self._uow.games.update(
+            {"id": game_id},
+            is_finished=True,
+            finished_at=datetime.now(UTC),
+        )
+        await self._update_ratings(game_id)
+
+    async def _update_ratings(self, game_id: UUID) -> None:
+        ratings = await self._uow.game_players.get_ratings(game_id)
+        max_score = max(rating.score for rating in ratings)
+        elo_deltas = {
+            rating.user_id: rules.get_elo_delta(rating.score, max_score)
+            for rating in ratings
+        }
+        await self._uow.game_winners.bulk_add(
+            [
+                {"game_id": game_id, "user_id": rating.user_id}
+                for rating in ratings
+                if rating.score == max_score
+            ]
+        )
+        await self._uow.users.bulk_update(
+            [
+                {"id": user_id, "elo": elo_delta}
+                for user_id, elo_delta in elo_deltas.items()
+            ],
+            increments=("elo",),
+        )
+        await self._uow.game_players.bulk_update(
+            [
+                {"user_id": user_id, "elo_delta": elo_delta}
+                for user_id, elo_delta in elo_deltas.items()
+            ],
+            keys=("user_id",),
+            game_id=game_id,
+        )
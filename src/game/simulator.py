@@ -0,0 +1,239 @@
+"""
+Headless game simulator.
+
+Plays complete games with the rules, dealer and card masks of the real
+game and no database, for bots, analysis and load generation.
+
+Run from the ``src`` directory: python -m game.simulator --games 1000
+"""
+import argparse
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Sequence
+
+from game import cards, rules
+from game.cards import SuitLiteral
+from game.dealer import Dealer
+from game.schemas import SimulationResultDTO
+
+
+class BotPolicy(ABC):
+    """
+    Decides the bids and the moves of one seat.
+
+    Hands and tricks are card masks, see ``game.cards``.
+    """
+
+    @abstractmethod
+    def bid(
+        self,
+        hand: int,
+        cards_per_player: int,
+        trump_suit: SuitLiteral | None,
+        bids: Sequence[int | None],
+    ) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def play(
+        self,
+        playable: int,
+        trick: int,
+        lead_suit: SuitLiteral | None,
+        trump_suit: SuitLiteral | None,
+    ) -> int:
+        """
+        Return the bit index of a card from the ``playable`` mask.
+        """
+        raise NotImplementedError
+
+
+class RandomPolicy(BotPolicy):
+    def __init__(self, seed: int | None = None) -> None:
+        self._rng = random.Random(seed)
+
+    def bid(
+        self,
+        hand: int,
+        cards_per_player: int,
+        trump_suit: SuitLiteral | None,
+        bids: Sequence[int | None],
+    ) -> int:
+        return self._rng.randint(0, cards_per_player)
+
+    def play(
+        self,
+        playable: int,
+        trick: int,
+        lead_suit: SuitLiteral | None,
+        trump_suit: SuitLiteral | None,
+    ) -> int:
+        for _ in range(int(self._rng.random() * playable.bit_count())):
+            playable &= playable - 1
+        return (playable & -playable).bit_length() - 1
+
+
+class GreedyPolicy(BotPolicy):
+    """
+    Bids its aces, kings and trumps, plays its highest card when it can
+    take the trick and its lowest card otherwise.
+    """
+
+    _HIGH_CARDS = sum(
+        1 << cards.get_index(suit, value)
+        for suit in cards.SUITS
+        for value in (13, 14)
+    )
+
+    def bid(
+        self,
+        hand: int,
+        cards_per_player: int,
+        trump_suit: SuitLiteral | None,
+        bids: Sequence[int | None],
+    ) -> int:
+        strong = hand & self._HIGH_CARDS
+        if trump_suit is not None:
+            strong |= hand & cards.SUIT_MASKS[trump_suit]
+        return min(strong.bit_count(), cards_per_player)
+
+    def play(
+        self,
+        playable: int,
+        trick: int,
+        lead_suit: SuitLiteral | None,
+        trump_suit: SuitLiteral | None,
+    ) -> int:
+        highest = playable.bit_length() - 1
+        if lead_suit is None:
+            return highest
+        winner = cards.get_winning_index(
+            trick | playable, lead_suit, trump_suit
+        )
+        if playable & (1 << winner):
+            return winner
+        return (playable & -playable).bit_length() - 1
+
+
+class Simulator:
+    def __init__(self, policies: Sequence[BotPolicy]) -> None:
+        self._policies = list(policies)
+        self._rounds = rules.generate_rounds(len(self._policies))
+
+    def play_game(self, seed: int | None = None) -> SimulationResultDTO:
+        """
+        Play every round of a game, seats keep the order of the policies.
+        """
+        players_number = len(self._policies)
+        card_dealer = Dealer(seed)
+        first_dealer = card_dealer.pick_first_dealer(players_number)
+        scores = [0] * players_number
+        for round_number, round_name in enumerate(self._rounds, 1):
+            hands, trump_suit, _ = card_dealer.deal_masks(
+                round_number, round_name, players_number
+            )
+            opening_seat = (first_dealer + round_number) % players_number
+            bids = self._collect_bids(
+                hands, round_name, trump_suit, opening_seat
+            )
+            tricks_taken = self._play_round(hands, trump_suit, opening_seat)
+            for seat in range(players_number):
+                scores[seat] += rules.get_score_addition(
+                    bids[seat], tricks_taken[seat]
+                )
+        max_score = max(scores)
+        return SimulationResultDTO(
+            scores=scores,
+            elo_deltas=[
+                rules.get_elo_delta(score, max_score) for score in scores
+            ],
+            winners=[
+                seat for seat, score in enumerate(scores) if score == max_score
+            ],
+        )
+
+    def _collect_bids(
+        self,
+        hands: list[int],
+        round_name: str,
+        trump_suit: SuitLiteral | None,
+        opening_seat: int,
+    ) -> list[int | None]:
+        players_number = len(hands)
+        cards_per_player = rules.get_cards_per_player(
+            round_name, players_number
+        )
+        bids: list[int | None] = [None] * players_number
+        for offset in range(players_number):
+            seat = (opening_seat + offset) % players_number
+            bids[seat] = self._policies[seat].bid(
+                hands[seat], cards_per_player, trump_suit, bids
+            )
+        return bids
+
+    def _play_round(
+        self, hands: list[int], trump_suit: SuitLiteral | None, leader: int
+    ) -> list[int]:
+        players_number = len(hands)
+        policies = self._policies
+        tricks_taken = [0] * players_number
+        owners = [0] * cards.DECK_SIZE
+        while hands[leader]:
+            index = policies[leader].play(hands[leader], 0, None, trump_suit)
+            hands[leader] &= ~(1 << index)
+            owners[index] = leader
+            lead_suit = cards.get_suit(index)
+            trick = 1 << index
+            for offset in range(1, players_number):
+                seat = (leader + offset) % players_number
+                hand = hands[seat]
+                index = policies[seat].play(
+                    cards.get_playable_mask(hand, lead_suit, trump_suit),
+                    trick,
+                    lead_suit,
+                    trump_suit,
+                )
+                hands[seat] = hand & ~(1 << index)
+                trick |= 1 << index
+                owners[index] = seat
+            leader = owners[
+                cards.get_winning_index(trick, lead_suit, trump_suit)
+            ]
+            tricks_taken[leader] += 1
+        return tricks_taken
+
+
+POLICIES = ("random", "greedy")
+
+
+def _make_policy(name: str, rng: random.Random) -> BotPolicy:
+    if name == "greedy":
+        return GreedyPolicy()
+    return RandomPolicy(rng.getrandbits(63))
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--policy", choices=POLICIES, default="random")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    simulator = Simulator(
+        [_make_policy(args.policy, rng) for _ in range(args.players)]
+    )
+    started_at = time.perf_counter()
+    for _ in range(args.games):
+        simulator.play_game(rng.getrandbits(63))
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"{args.games} games of {args.players} players in {elapsed:.2f}s, "
+        f"{args.games / elapsed:.0f} games/sec"
+    )
+
+
+if __name__ == "__main__":
+    main()
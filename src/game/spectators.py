@@ -0,0 +1,122 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from game.schemas import FullGameCardInfoEventDTO, GameEventDTO
+from managers import game_ws_manager
+
+SendFrame = Callable[[UUID, str], Awaitable[None]]
+
+
+class SpectatorFeed:
+    """
+    Delays game events for spectators.
+
+    Each event is serialized once when it is recorded and kept in a
+    time-ordered ring per game. A single scheduler task releases the due
+    frames of all games to their spectators, so the number of sleeping
+    tasks and serializations does not grow with the number of spectators.
+
+    Released frames are kept from the last released snapshot on, so a new
+    spectator can catch up with the delayed state of the game. When more
+    than ``max_pending`` frames of a game wait, the frames before the
+    newest pending snapshot are dropped, as the snapshot covers them;
+    deltas without a newer snapshot are always kept so no gap is sent.
+    """
+
+    def __init__(
+        self,
+        send: SendFrame,
+        delay: float = 60 * 5,
+        max_pending: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._send = send
+        self._delay = delay
+        self._max_pending = max_pending
+        self._clock = clock
+        self._pending: dict[UUID, deque[tuple[float, str, bool]]] = {}
+        self._released: dict[UUID, list[str]] = {}
+        self._has_pending = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def record(
+        self, game_id: UUID, event: FullGameCardInfoEventDTO | GameEventDTO
+    ) -> None:
+        self.record_frame(
+            game_id,
+            event.model_dump_json(by_alias=True),
+            isinstance(event, FullGameCardInfoEventDTO),
+        )
+
+    def record_frame(
+        self, game_id: UUID, frame: str, is_snapshot: bool = False
+    ) -> None:
+        release_at = self._clock() + self._delay
+        pending = self._pending.get(game_id)
+        if pending is None:
+            pending = self._pending[game_id] = deque()
+        pending.append((release_at, frame, is_snapshot))
+        if len(pending) > self._max_pending:
+            self._drop_covered(pending)
+        self._has_pending.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def get_released(self, game_id: UUID) -> list[str]:
+        """
+        Return the frames a new spectator needs to reach the delayed state.
+        """
+        return list(self._released.get(game_id, []))
+
+    def pending_count(self, game_id: UUID) -> int:
+        return len(self._pending.get(game_id, ()))
+
+    def discard(self, game_id: UUID) -> None:
+        self._pending.pop(game_id, None)
+        self._released.pop(game_id, None)
+
+    async def release_due(self) -> float | None:
+        """
+        Send all due frames and return the release time of the next one.
+        """
+        now = self._clock()
+        next_release_at = None
+        for game_id, pending in list(self._pending.items()):
+            frames = []
+            while pending and pending[0][0] <= now:
+                _, frame, is_snapshot = pending.popleft()
+                if is_snapshot:
+                    self._released[game_id] = []
+                self._released.setdefault(game_id, []).append(frame)
+                frames.append(frame)
+            if not pending:
+                del self._pending[game_id]
+            elif next_release_at is None or pending[0][0] < next_release_at:
+                next_release_at = pending[0][0]
+            for frame in frames:
+                await self._send(game_id, frame)
+        return next_release_at
+
+    @staticmethod
+    def _drop_covered(pending: deque[tuple[float, str, bool]]) -> None:
+        for index in range(len(pending) - 1, 0, -1):
+            if pending[index][2]:
+                for _ in range(index):
+                    pending.popleft()
+                return
+
+    async def _run(self) -> None:
+        while True:
+            next_release_at = await self.release_due()
+            if next_release_at is None:
+                self._has_pending.clear()
+                if not self._pending:
+                    await self._has_pending.wait()
+                continue
+            await asyncio.sleep(max(next_release_at - self._clock(), 0))
+
+
+spectator_feed = SpectatorFeed(game_ws_manager.send_frame_to_spectators)
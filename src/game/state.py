@@ -0,0 +1,301 @@
+import asyncio
+from functools import cached_property
+from typing import Awaitable, Callable, Sequence
+from uuid import UUID, uuid4
+
+from auth.schemas import UserInfoDTO
+from game import cards, rules
+from game.exceptions import InvalidMoveError
+from game.rules import SuitLiteral
+from game.schemas import (
+    FullCardInfoDTO,
+    FullEntryCardInfoDTO,
+    FullGameCardInfoDTO,
+    FullUserCardInfoDTO,
+    GameEventDTO,
+    GameStateSnapshotDTO,
+    MoveResultDTO,
+)
+
+
+class GameState:
+    """
+    Authoritative in-memory state of the current round of a game.
+
+    Moves are validated and applied here without touching the database,
+    the caller is responsible for persisting the returned results.
+    """
+
+    def __init__(
+        self,
+        game_id: UUID,
+        round_id: UUID,
+        round_name: str,
+        round_number: int | None,
+        trump_suit: SuitLiteral | None,
+        trump_value: int | None,
+        opening_player_id: UUID,
+        players: Sequence[UserInfoDTO],
+        hands: dict[UUID, list[FullCardInfoDTO]],
+        bids: dict[UUID, int | None] | None = None,
+        tricks_taken: dict[UUID, int] | None = None,
+        scores: dict[UUID, int] | None = None,
+        trick: list[FullCardInfoDTO] | None = None,
+        entry_id: UUID | None = None,
+        leader_id: UUID | None = None,
+    ) -> None:
+        self.game_id = game_id
+        self.round_id = round_id
+        self.round_name = round_name
+        self.round_number = round_number
+        self.trump_suit = trump_suit
+        self.trump_value = trump_value
+        self.opening_player_id = opening_player_id
+        self.players: dict[UUID, UserInfoDTO] = {p.id: p for p in players}
+        self.seats: list[UUID] = [p.id for p in players]
+        self._cards: dict[int, FullCardInfoDTO] = {}
+        self._indexes: dict[UUID, int] = {}
+        self.hands: dict[UUID, int] = {
+            user_id: self._add_cards(hands.get(user_id, []))
+            for user_id in self.seats
+        }
+        self.bids: dict[UUID, int | None] = {
+            user_id: (bids or {}).get(user_id) for user_id in self.seats
+        }
+        self.tricks_taken: dict[UUID, int] = {
+            user_id: (tricks_taken or {}).get(user_id, 0)
+            for user_id in self.seats
+        }
+        self.scores: dict[UUID, int] = {
+            user_id: (scores or {}).get(user_id, 0) for user_id in self.seats
+        }
+        self.trick: list[int] = []
+        self.trick_mask = 0
+        self.entry_id = entry_id or uuid4()
+        self.leader_id = leader_id or opening_player_id
+        self.owner_id: UUID | None = None
+        if trick:
+            self._add_cards(trick)
+            for card in trick:
+                self._add_to_trick(self._indexes[card.id])
+        self.is_trick_finished = False
+        self.is_round_finished = False
+        self.is_finished = False
+        self.version = 0
+
+    @cached_property
+    def cards_per_player(self) -> int:
+        """
+        Hand size dealt in the round, it bounds the bids of the round.
+        """
+        return rules.get_cards_per_player(self.round_name, len(self.seats))
+
+    @property
+    def turn_id(self) -> UUID:
+        if self.is_trick_finished or not self.trick:
+            return self.leader_id
+        leader_seat = self.seats.index(self.leader_id)
+        return self.seats[(leader_seat + len(self.trick)) % len(self.seats)]
+
+    def place_bid(self, user_id: UUID, bid: int) -> None:
+        if user_id not in self.bids:
+            raise InvalidMoveError("You are not a player of this round.")
+        if self.is_round_finished:
+            raise InvalidMoveError("The round is finished.")
+        self.bids[user_id] = bid
+        self.version += 1
+
+    def play_card(
+        self, user_id: UUID, card_id: UUID, entry_id: UUID | None = None
+    ) -> MoveResultDTO:
+        if self.is_round_finished:
+            raise InvalidMoveError("The round is finished.")
+        if user_id != self.turn_id:
+            raise InvalidMoveError("It is not your turn.")
+        hand = self.hands[user_id]
+        index = self._indexes.get(card_id)
+        if index is None or not hand & (1 << index):
+            raise InvalidMoveError("You do not have this card.")
+        is_new_entry = self.is_trick_finished or not self.trick
+        lead_suit = None if is_new_entry else cards.get_suit(self.trick[0])
+        if not cards.is_playable(index, hand, lead_suit, self.trump_suit):
+            raise InvalidMoveError("You must follow the suit or play trump.")
+
+        if is_new_entry:
+            self.entry_id = entry_id or uuid4()
+            self.leader_id = user_id
+            self.trick = []
+            self.trick_mask = 0
+            self.is_trick_finished = False
+        self.hands[user_id] = hand & ~(1 << index)
+        card = self._cards[index].model_copy(
+            update={"entry_id": self.entry_id}
+        )
+        self._cards[index] = card
+        owner_id = self._add_to_trick(index)
+        if len(self.trick) == len(self.seats):
+            self.is_trick_finished = True
+            self.tricks_taken[owner_id] += 1
+            self.leader_id = owner_id
+            if not any(self.hands.values()):
+                self._finish_round()
+        self.version += 1
+        return MoveResultDTO(
+            card=card,
+            entry_id=self.entry_id,
+            owner_id=owner_id,
+            is_new_entry=is_new_entry,
+            is_trick_finished=self.is_trick_finished,
+            is_round_finished=self.is_round_finished,
+        )
+
+    def apply_event(self, event: GameEventDTO) -> None:
+        """
+        Replay a logged event, events derived from moves are skipped.
+        """
+        if event.event == "bid_placed":
+            self.place_bid(event.data.user_id, event.data.bid)
+        elif event.event == "card_played":
+            card = event.data.card
+            self.play_card(card.user_id, card.id, entry_id=card.entry_id)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: GameStateSnapshotDTO) -> "GameState":
+        return cls(**dict(snapshot))
+
+    def to_snapshot(self) -> GameStateSnapshotDTO:
+        return GameStateSnapshotDTO(
+            game_id=self.game_id,
+            round_id=self.round_id,
+            round_name=self.round_name,
+            round_number=self.round_number,
+            trump_suit=self.trump_suit,
+            trump_value=self.trump_value,
+            opening_player_id=self.opening_player_id,
+            players=[self.players[user_id] for user_id in self.seats],
+            hands={
+                user_id: [
+                    self._cards[index]
+                    for index in cards.iter_indexes(self.hands[user_id])
+                ]
+                for user_id in self.seats
+            },
+            bids=self.bids,
+            tricks_taken=self.tricks_taken,
+            scores=self.scores,
+            trick=[]
+            if self.is_trick_finished
+            else [self._cards[index] for index in self.trick],
+            entry_id=self.entry_id,
+            leader_id=self.leader_id,
+        )
+
+    def to_dto(self) -> FullGameCardInfoDTO:
+        return FullGameCardInfoDTO(
+            round_id=self.round_id,
+            users=[
+                FullUserCardInfoDTO(
+                    **self.players[user_id].model_dump(),
+                    bid=self.bids[user_id],
+                    actual_bid=self.tricks_taken[user_id],
+                    score=self.scores[user_id],
+                    cards=[
+                        self._cards[index]
+                        for index in cards.iter_indexes(self.hands[user_id])
+                    ],
+                    cards_count=self.hands[user_id].bit_count(),
+                )
+                for user_id in self.seats
+            ],
+            entry=FullEntryCardInfoDTO(
+                id=self.entry_id,
+                cards=[self._cards[index] for index in self.trick],
+            )
+            if self.trick
+            else None,
+            trump_suit=self.trump_suit,
+            trump_value=self.trump_value,
+        )
+
+    def _add_cards(self, hand: Sequence[FullCardInfoDTO]) -> int:
+        mask = 0
+        for card in hand:
+            index = cards.get_index(card.suit, card.value)
+            self._cards[index] = card
+            self._indexes[card.id] = index
+            mask |= 1 << index
+        return mask
+
+    def _add_to_trick(self, index: int) -> UUID:
+        self.trick.append(index)
+        self.trick_mask |= 1 << index
+        winner = cards.get_winning_index(
+            self.trick_mask, cards.get_suit(self.trick[0]), self.trump_suit
+        )
+        self.owner_id = self._cards[winner].user_id
+        return self.owner_id
+
+    def _finish_round(self) -> None:
+        for user_id in self.seats:
+            self.scores[user_id] += rules.get_score_addition(
+                self.bids[user_id], self.tricks_taken[user_id]
+            )
+        self.is_round_finished = True
+
+
+class GameStateRegistry:
+    """
+    Keeps loaded game states in memory, one state per game.
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[UUID, GameState] = {}
+        self._locks: dict[UUID, asyncio.Lock] = {}
+        self._sequences: dict[UUID, int] = {}
+
+    def get(self, game_id: UUID) -> GameState | None:
+        return self._states.get(game_id)
+
+    async def get_or_load(
+        self, game_id: UUID, loader: Callable[[], Awaitable[GameState]]
+    ) -> GameState:
+        state = self._states.get(game_id)
+        if state is not None:
+            return state
+        async with self._locks.setdefault(game_id, asyncio.Lock()):
+            state = self._states.get(game_id)
+            if state is None:
+                state = await loader()
+                self._states[game_id] = state
+        return state
+
+    def discard(self, game_id: UUID) -> None:
+        """
+        Drop the loaded state, it will be reloaded on the next access.
+
+        The event sequence of the game is kept.
+        """
+        self._states.pop(game_id, None)
+        self._locks.pop(game_id, None)
+
+    def forget(self, game_id: UUID) -> None:
+        self.discard(game_id)
+        self._sequences.pop(game_id, None)
+
+    def next_sequence(self, game_id: UUID) -> int:
+        sequence = self._sequences.get(game_id, 0) + 1
+        self._sequences[game_id] = sequence
+        return sequence
+
+    def get_sequence(self, game_id: UUID) -> int:
+        return self._sequences.get(game_id, 0)
+
+    def set_sequence(self, game_id: UUID, sequence: int) -> None:
+        """
+        Move the sequence forward, e.g. to the last logged event of a game
+        loaded by a fresh worker. It never goes back.
+        """
+        self._sequences[game_id] = max(self.get_sequence(game_id), sequence)
+
+
+game_states = GameStateRegistry()
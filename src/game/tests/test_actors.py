@@ -0,0 +1,68 @@
+import asyncio
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+import pytest
+
+from game.actors import GameActorRegistry
+from game.exceptions import GameIsBusyError
+
+
+class TestGameActorRegistry:
+    async def test_commands_run_one_at_a_time_in_order(self):
+        registry = GameActorRegistry()
+        game_id = uuid4()
+        log = []
+
+        def make_command(number: int) -> Callable[[], Awaitable[int]]:
+            async def command() -> int:
+                log.append(("start", number))
+                await asyncio.sleep(0)
+                log.append(("end", number))
+                return number
+
+            return command
+
+        results = await asyncio.gather(
+            *(registry.submit(game_id, make_command(i)) for i in range(3))
+        )
+
+        assert results == [0, 1, 2]
+        assert log == [
+            (step, number) for number in range(3) for step in ("start", "end")
+        ]
+        registry.stop(game_id)
+
+    async def test_errors_are_returned_to_the_caller(self):
+        registry = GameActorRegistry()
+        game_id = uuid4()
+
+        async def fail():
+            raise ValueError("bad move")
+
+        with pytest.raises(ValueError):
+            await registry.submit(game_id, fail)
+        assert (
+            await registry.submit(game_id, lambda: asyncio.sleep(0, "ok"))
+            == "ok"
+        )
+        registry.stop(game_id)
+
+    async def test_full_queue_rejects_commands(self):
+        registry = GameActorRegistry(max_queue_size=1)
+        game_id = uuid4()
+        release = asyncio.Event()
+
+        running = asyncio.create_task(registry.submit(game_id, release.wait))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(registry.submit(game_id, release.wait))
+        await asyncio.sleep(0)
+
+        assert registry.get_queue_depth(game_id) == 1
+        with pytest.raises(GameIsBusyError):
+            await registry.submit(game_id, release.wait)
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert registry.get_queue_depth(game_id) == 0
+        registry.stop(game_id)
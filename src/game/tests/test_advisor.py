@@ -0,0 +1,58 @@
+from typing import Iterable
+
+import pytest
+from pydantic import ValidationError
+
+from game.advisor import estimate_tricks
+from game.cards import SuitLiteral
+from game.schemas import BidAdviceRequestDTO, CardDTO
+
+
+def _suit(suit: SuitLiteral, values: Iterable[int]) -> list[CardDTO]:
+    return [CardDTO(suit=suit, value=value) for value in values]
+
+
+class TestEstimateTricks:
+    def test_leading_a_whole_suit_takes_every_trick(self):
+        advice = estimate_tricks(
+            _suit("H", range(6, 15)), None, 0, 4, samples=200, seed=1
+        )
+        assert advice.distribution[-1] == 1.0
+        assert advice.recommended_bid == 9
+
+    def test_losing_the_lead_without_trumps_takes_nothing(self):
+        advice = estimate_tricks(
+            _suit("H", range(6, 15)), "C", 0, 4, samples=200, seed=1
+        )
+        assert advice.distribution[0] == 1.0
+        assert advice.recommended_bid == 0
+
+    def test_distribution(self):
+        hand = _suit("S", [13, 14]) + _suit("D", [7])
+        advice = estimate_tricks(hand, "S", 2, 5, samples=1000, seed=3)
+        assert len(advice.distribution) == 4
+        assert sum(advice.distribution) == pytest.approx(1)
+        assert advice.distribution[0] == 0
+        assert advice == estimate_tricks(hand, "S", 2, 5, samples=1000, seed=3)
+
+    def test_hand_too_large(self):
+        with pytest.raises(ValueError):
+            estimate_tricks(_suit("H", range(6, 15)), None, 0, 5)
+
+    def test_impossible_hands(self):
+        with pytest.raises(ValueError):
+            estimate_tricks(_suit("H", [6, 6]), None, 0, 4)
+        with pytest.raises(ValueError):
+            estimate_tricks(_suit("H", [6, 7]), "H", 0, 4, trump_value=7)
+
+
+class TestBidAdviceRequestDTO:
+    def test_rejects_repeated_cards(self):
+        with pytest.raises(ValidationError, match="repeated cards"):
+            BidAdviceRequestDTO(hand=_suit("H", [6, 6]))
+
+    def test_rejects_trump_card_in_hand(self):
+        with pytest.raises(ValidationError, match="trump card"):
+            BidAdviceRequestDTO(
+                hand=_suit("H", [6, 7]), trump_suit="H", trump_value=7
+            )
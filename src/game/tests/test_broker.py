@@ -0,0 +1,195 @@
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+import pytest
+from fastapi.websockets import WebSocket
+
+from auth.schemas import UserInfoDTO
+from broker import Handler, InProcessBroker, Message, PostgresBroker
+from game.schemas import PUBLIC_VIEW
+from managers import REFRESH_FRAME, GameWSManager
+from schemas import ErrorEventDTO
+
+
+class FakePool:
+    def __init__(self) -> None:
+        self.notifications: list[tuple[str, str]] = []
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator["FakePool"]:
+        yield self
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[None]:
+        yield
+
+    async def executemany(
+        self, query: str, args: list[tuple[str, str]]
+    ) -> None:
+        self.notifications.extend(args)
+
+
+class FakeWebSocket(WebSocket):
+    def __init__(self) -> None:
+        self.frames: list[str] = []
+
+    async def accept(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        self.frames.append(data)
+
+
+class TestInProcessBroker:
+    async def test_failed_handler_does_not_stop_others(self) -> None:
+        broker = InProcessBroker()
+        received: list[Message] = []
+
+        def fail(message: Message) -> None:
+            raise ValueError("bad message")
+
+        await broker.subscribe("games", fail)
+        await broker.subscribe("games", received.append)
+        await broker.publish("games", {"frame": "x"})
+
+        assert received == [{"frame": "x"}]
+
+
+class FailingBroker(InProcessBroker):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise OSError("connection refused")
+        await super().subscribe(channel, handler)
+
+
+def make_user(number: int) -> UserInfoDTO:
+    return UserInfoDTO(
+        id=uuid4(),
+        username=f"user{number}",
+        email=f"user{number}@example.com",
+        elo=1000,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+class TestPostgresBroker:
+    async def test_large_messages_are_sent_in_chunks(self):
+        sender = PostgresBroker("postgresql://test")
+        receiver = PostgresBroker("postgresql://test")
+        sender._pool = FakePool()
+        sent: list[Message] = []
+        received: list[Message] = []
+        sender._handlers["games"] = [sent.append]
+        receiver._handlers["games"] = [received.append]
+        message = {"frame": "x" * 20_000, "kind": None}
+
+        await sender.publish("games", message)
+        assert sent == [message]
+        await sender.drain()
+
+        notifications = sender._pool.notifications
+        assert len(notifications) == 3
+        assert all(len(payload) < 8000 for _, payload in notifications)
+        for channel, payload in notifications:
+            sender._on_notify(None, 0, channel, payload)
+            receiver._on_notify(None, 0, channel, payload)
+        assert sent == [message]
+        assert received == [message]
+
+    async def test_messages_published_together_are_sent_in_order(self):
+        broker = PostgresBroker("postgresql://test")
+        broker._pool = FakePool()
+
+        for number in range(3):
+            await broker.publish("games", {"frame": str(number)})
+        await broker.drain()
+
+        assert [
+            payload.split(":", 3)[3]
+            for _, payload in broker._pool.notifications
+        ] == ['{"frame":"0"}', '{"frame":"1"}', '{"frame":"2"}']
+
+    async def test_incomplete_messages_are_evicted(self):
+        broker = PostgresBroker("postgresql://test")
+        broker._parts["other.0"] = (time.monotonic() - 60, ["{"])
+
+        broker._on_notify(None, 0, "games", "other.1:0:2:{")
+
+        assert list(broker._parts) == ["other.1"]
+
+
+class TestBrokerFanOut:
+    async def test_messages_reach_users_of_every_worker(self):
+        broker = InProcessBroker()
+        workers = [GameWSManager(broker), GameWSManager(broker)]
+        game_id = uuid4()
+        sockets = []
+        for number, manager in enumerate(workers):
+            user = make_user(number)
+            sockets.append(FakeWebSocket())
+            await manager.connect_player_to_game(sockets[-1], user, game_id)
+
+        await workers[0].send_frame_to_spectators(game_id, "spectators")
+        await workers[0].send_frames_to_players(
+            game_id, {PUBLIC_VIEW: "snapshot"}
+        )
+        await workers[1].send_to_user(
+            user.id, ErrorEventDTO(event="error", data={"message": "x"})
+        )
+        for manager in workers:
+            await manager.drain()
+
+        assert sockets[0].frames == ["snapshot"]
+        assert sockets[1].frames[0] == "snapshot"
+        assert '"event":"error"' in sockets[1].frames[1]
+
+    async def test_own_frames_stay_off_the_channel(self) -> None:
+        broker = InProcessBroker()
+        published: list[Message] = []
+        await broker.subscribe(GameWSManager.CHANNEL, published.append)
+        workers = [GameWSManager(broker), GameWSManager(broker)]
+        game_id = uuid4()
+        users = [make_user(number) for number in range(2)]
+        sockets = [FakeWebSocket(), FakeWebSocket()]
+        for manager, user, websocket in zip(workers, users, sockets):
+            await manager.connect_player_to_game(websocket, user, game_id)
+
+        await workers[0].send_frames_to_players(
+            game_id,
+            {
+                PUBLIC_VIEW: "public",
+                users[0].id: "hand 0",
+                users[1].id: "hand 1",
+            },
+        )
+        for manager in workers:
+            await manager.drain()
+
+        assert sockets[0].frames == ["hand 0"]
+        assert sockets[1].frames == [REFRESH_FRAME]
+        assert "hand" not in str(published)
+
+    async def test_failed_subscription_is_retried(self) -> None:
+        manager = GameWSManager(FailingBroker(failures=1))
+        user, game_id = make_user(0), uuid4()
+
+        with pytest.raises(OSError):
+            await manager.connect_player_to_game(
+                FakeWebSocket(), user, game_id
+            )
+        websocket = FakeWebSocket()
+        await manager.connect_player_to_game(websocket, user, game_id)
+        await manager.send_frames_to_players(
+            game_id, {PUBLIC_VIEW: "snapshot"}
+        )
+        await manager.drain()
+
+        assert websocket.frames == ["snapshot"]
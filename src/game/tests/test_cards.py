@@ -0,0 +1,55 @@
+from game import cards
+from game.schemas import CardDTO
+
+
+class TestCardEncoding:
+    def test_round_trip(self):
+        deck = [
+            CardDTO(suit=suit, value=value)
+            for suit in cards.SUITS
+            for value in cards.VALUES
+        ]
+        assert [cards.decode(cards.encode(card)) for card in deck] == deck
+        assert cards.to_mask(deck) == cards.FULL_DECK
+        assert cards.from_mask(cards.FULL_DECK) == deck
+
+    def test_suit_masks_partition_deck(self):
+        union = 0
+        for mask in cards.SUIT_MASKS.values():
+            assert union & mask == 0
+            union |= mask
+        assert union == cards.FULL_DECK
+
+
+class TestRules:
+    def test_must_follow_lead_or_trump(self):
+        hand = cards.to_mask(
+            [CardDTO(suit="H", value=6), CardDTO(suit="D", value=10)]
+        )
+        diamond = cards.get_index("D", 10)
+        assert not cards.is_playable(diamond, hand, "H", "S")
+        assert cards.is_playable(diamond, hand, "C", "S")
+        assert cards.is_playable(diamond, hand, None, "S")
+
+    def test_playable_mask(self):
+        heart = cards.get_index("H", 6)
+        diamond = cards.get_index("D", 10)
+        hand = 1 << heart | 1 << diamond
+        assert cards.get_playable_mask(hand, "H", "S") == 1 << heart
+        assert cards.get_playable_mask(hand, "C", "S") == hand
+        assert cards.get_playable_mask(hand, "C", "D") == 1 << diamond
+        assert cards.get_playable_mask(hand, None, None) == hand
+
+    def test_trump_wins_over_higher_lead(self):
+        trick = cards.to_mask(
+            [CardDTO(suit="H", value=14), CardDTO(suit="S", value=6)]
+        )
+        winner = cards.get_winning_index(trick, "H", "S")
+        assert cards.decode(winner) == CardDTO(suit="S", value=6)
+
+    def test_off_suit_never_wins(self):
+        trick = cards.to_mask(
+            [CardDTO(suit="H", value=7), CardDTO(suit="D", value=14)]
+        )
+        winner = cards.get_winning_index(trick, "H", None)
+        assert cards.decode(winner) == CardDTO(suit="H", value=7)
@@ -0,0 +1,46 @@
+from game import cards
+from game.dealer import Dealer
+
+
+class TestDealer:
+    def test_hands_do_not_overlap(self):
+        deal = Dealer(seed=1).deal(1, "9", 4)
+        dealt = [cards.encode(card) for hand in deal.hands for card in hand]
+        assert [len(hand) for hand in deal.hands] == [9, 9, 9, 9]
+        assert len(set(dealt)) == 36
+        assert deal.trump_suit is not None
+        assert deal.trump_value is None
+
+    def test_trump_is_not_dealt(self):
+        deal = Dealer(seed=2).deal(3, "3", 3)
+        dealt = {
+            (card.suit, card.value) for hand in deal.hands for card in hand
+        }
+        if deal.trump_value is not None:
+            assert (deal.trump_suit, deal.trump_value) not in dealt
+
+    def test_no_trumps_round(self):
+        deal = Dealer(seed=3).deal(10, "NTR", 5)
+        assert deal.trump_suit is None
+        assert deal.trump_value is None
+
+    def test_no_trumps_round_with_full_deck(self):
+        for seed in range(20):
+            deal = Dealer(seed=seed).deal(30, "NTR", 4)
+            assert sum(len(hand) for hand in deal.hands) == cards.DECK_SIZE
+            assert deal.trump_suit is None
+            assert deal.trump_value is None
+
+    def test_same_seed_same_deal(self):
+        assert Dealer(seed=42).deal(7, "4", 6) == Dealer(seed=42).deal(
+            7, "4", 6
+        )
+        assert Dealer(seed=42).deal(7, "4", 6) != Dealer(seed=43).deal(
+            7, "4", 6
+        )
+
+    def test_masks_match_deal(self):
+        deal = Dealer(seed=5).deal(4, "5", 4)
+        hands, trump_suit, trump_value = Dealer(seed=5).deal_masks(4, "5", 4)
+        assert hands == [cards.to_mask(hand) for hand in deal.hands]
+        assert (trump_suit, trump_value) == (deal.trump_suit, deal.trump_value)
@@ -0,0 +1,158 @@
+import json
+from datetime import datetime
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+
+from auth.schemas import UserInfoDTO
+from game.exceptions import GameIsFinishedError
+from game.projections import game_projection
+from game.schemas import PUBLIC_VIEW, FullCardInfoDTO, ProcessCardDTO
+from game.services import game as game_service
+from game.services.game import GameService
+from game.state import GameState, game_states
+from game.write_behind import WriteOp
+from unitofwork import IUnitOfWork
+
+
+class FakeUnitOfWork(IUnitOfWork):
+    def __init__(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "FakeUnitOfWork":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        pass
+
+    async def commit(self) -> None:
+        pass
+
+    async def rollback(self) -> None:
+        pass
+
+
+class FakeWriteBehindQueue:
+    def __init__(self) -> None:
+        self.ops: list[WriteOp] = []
+
+    def push(self, game_id: UUID, *ops: WriteOp) -> None:
+        self.ops.extend(ops)
+
+
+def make_player() -> UserInfoDTO:
+    return UserInfoDTO(
+        id=uuid4(),
+        username="alice",
+        email="alice@example.com",
+        elo=1000,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def make_state(player: UserInfoDTO, cards: list[FullCardInfoDTO]) -> GameState:
+    return GameState(
+        game_id=uuid4(),
+        round_id=uuid4(),
+        round_name=str(len(cards)),
+        round_number=1,
+        trump_suit=None,
+        trump_value=None,
+        opening_player_id=player.id,
+        players=[player],
+        hands={player.id: cards},
+        bids={player.id: len(cards)},
+    )
+
+
+class TestProcessCard:
+    async def test_last_move_of_game_returns_its_events(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        player = make_player()
+        card = FullCardInfoDTO(
+            id=uuid4(), suit="H", value=14, user_id=player.id
+        )
+        state = make_state(player, [card])
+
+        async def load() -> GameState:
+            return state
+
+        async def finish(game_id: UUID, state: GameState) -> None:
+            state.is_finished = True
+            raise GameIsFinishedError
+
+        await game_states.get_or_load(state.game_id, load)
+        monkeypatch.setattr(
+            game_service, "write_behind_queue", FakeWriteBehindQueue()
+        )
+        service = GameService(FakeUnitOfWork())
+        monkeypatch.setattr(service, "_switch_round", finish)
+
+        events = await service.process_card(
+            ProcessCardDTO(card_id=card.id, owner_id=player.id),
+            state.game_id,
+        )
+
+        assert [event.event for event in events] == [
+            "card_played",
+            "trick_won",
+            "round_ended",
+        ]
+        game_states.forget(state.game_id)
+
+
+class TestGetFullGameFrames:
+    async def test_snapshot_takes_seq_of_last_event(self) -> None:
+        player = make_player()
+        card = FullCardInfoDTO(
+            id=uuid4(), suit="H", value=14, user_id=player.id
+        )
+        state = make_state(player, [card])
+
+        async def load() -> GameState:
+            return state
+
+        await game_states.get_or_load(state.game_id, load)
+        game_states.set_sequence(state.game_id, 7)
+        frames = await GameService(FakeUnitOfWork()).get_full_game_frames(
+            state.game_id
+        )
+
+        assert json.loads(frames[PUBLIC_VIEW])["seq"] == 7
+        assert game_states.next_sequence(state.game_id) == 8
+        game_states.forget(state.game_id)
+        game_projection.discard(state.game_id)
+
+
+class TestSwitchRound:
+    async def test_failure_discards_finished_round_state(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        player = make_player()
+        state = GameState(
+            game_id=uuid4(),
+            round_id=uuid4(),
+            round_name="1",
+            round_number=1,
+            trump_suit=None,
+            trump_value=None,
+            opening_player_id=player.id,
+            players=[player],
+            hands={},
+        )
+
+        async def load() -> GameState:
+            return state
+
+        async def fail(*args: Any) -> None:
+            raise OSError("connection lost")
+
+        await game_states.get_or_load(state.game_id, load)
+        service = GameService(FakeUnitOfWork())
+        monkeypatch.setattr(service, "_prepare_next_round", fail)
+
+        with pytest.raises(OSError):
+            await service._switch_round(state.game_id, state)
+        assert game_states.get(state.game_id) is None
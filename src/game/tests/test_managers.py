@@ -0,0 +1,367 @@
+import asyncio
+import json
+import random
+from datetime import datetime
+from typing import Any, Callable
+from uuid import UUID, uuid4
+
+from fastapi import status
+from fastapi.websockets import WebSocket, WebSocketDisconnect
+
+from auth.schemas import UserInfoDTO
+from game.schemas import (
+    PUBLIC_VIEW,
+    GameIdPayloadDTO,
+    GameStartEventDTO,
+    NewWatcherEventDTO,
+)
+from managers import Connection, GameWSManager, Heartbeat, LobbyWSManager
+from schemas import ErrorEventDTO
+
+
+def make_user(username: str) -> UserInfoDTO:
+    return UserInfoDTO(
+        id=uuid4(),
+        username=username,
+        email=f"{username}@example.com",
+        elo=1000,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+async def wait_until(predicate: Callable[[], bool]) -> None:
+    while not predicate():
+        await asyncio.sleep(0)
+
+
+class FakeWebSocket(WebSocket):
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.frames: list[str] = []
+        self.close_code: int | None = None
+        self.unblocked = asyncio.Event()
+        self.unblocked.set()
+
+    async def accept(self, *args: Any, **kwargs: Any) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        await asyncio.sleep(0)
+        await self.unblocked.wait()
+        if self.fail:
+            raise WebSocketDisconnect
+        self.frames.append(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.close_code = code
+
+
+class TestConnection:
+    async def test_drop_policy_skips_new_frames(self):
+        ws = FakeWebSocket()
+        ws.unblocked.clear()
+        connection = Connection(ws, self.on_close, 2, "drop")
+
+        sent = [connection.send(str(i)) for i in range(3)]
+
+        assert sent == [True, True, False]
+        ws.unblocked.set()
+        await connection.drain()
+        assert ws.frames == ["0", "1"]
+
+    async def test_coalesce_policy_replaces_frame_of_same_kind(self):
+        ws = FakeWebSocket()
+        ws.unblocked.clear()
+        connection = Connection(ws, self.on_close, 2, "coalesce")
+
+        connection.send("sending", "state")
+        await asyncio.sleep(0)
+        connection.send("state 1", "state")
+        connection.send("event 1")
+        assert connection.send("state 2", "state")
+        assert not connection.send("event 2")
+
+        ws.unblocked.set()
+        await connection.drain()
+        assert ws.frames == ["sending", "event 1", "state 2"]
+
+    async def test_evict_policy_closes_slow_connection(self):
+        ws = FakeWebSocket()
+        ws.unblocked.clear()
+        closed = []
+
+        async def on_close() -> None:
+            closed.append(True)
+
+        connection = Connection(ws, on_close, 2, "evict")
+        for i in range(4):
+            connection.send(str(i))
+
+        ws.unblocked.set()
+        await connection.drain()
+        assert ws.close_code == status.WS_1013_TRY_AGAIN_LATER
+        assert closed == [True]
+        assert not connection.send("late")
+
+    async def on_close(self) -> None:
+        pass
+
+
+class TestGameWSManager:
+    async def test_slow_spectator_does_not_delay_players(self):
+        manager = GameWSManager(max_queue_size=2, policy="evict")
+        game_id = uuid4()
+        player, spectator = make_user("alice"), make_user("bob")
+        player_ws, spectator_ws = FakeWebSocket(), FakeWebSocket()
+        spectator_ws.unblocked.clear()
+        await manager.connect_player_to_game(player_ws, player, game_id)
+        await manager.connect_spectator_to_game(
+            spectator_ws, spectator, game_id
+        )
+
+        for i in range(5):
+            await manager.broadcast_to_all(
+                game_id, NewWatcherEventDTO(event="new_watcher", data=[])
+            )
+            await asyncio.sleep(0)
+        await asyncio.wait_for(
+            wait_until(lambda: len(player_ws.frames) == 5), timeout=1
+        )
+
+        spectator_ws.unblocked.set()
+        await manager.drain()
+        assert spectator_ws.close_code == status.WS_1013_TRY_AGAIN_LATER
+        assert manager.get_users(game_id, "spectators") == []
+        assert manager.get_users(game_id, "players") == [player]
+
+    async def test_broadcast_sends_one_frame_to_all(self):
+        manager = GameWSManager()
+        game_id = uuid4()
+        player, spectator = make_user("alice"), make_user("bob")
+        player_ws, spectator_ws = FakeWebSocket(), FakeWebSocket()
+        await manager.connect_player_to_game(player_ws, player, game_id)
+        await manager.connect_spectator_to_game(
+            spectator_ws, spectator, game_id
+        )
+
+        event = NewWatcherEventDTO(event="new_watcher", data=[spectator])
+        await manager.broadcast_to_all(game_id, event)
+        await manager.drain()
+
+        assert player_ws.frames == [event.model_dump_json(by_alias=True)]
+        assert player_ws.frames[0] is spectator_ws.frames[0]
+
+    async def test_broadcast_disconnects_failed_sockets(self):
+        manager = GameWSManager()
+        game_id = uuid4()
+        alice, bob = make_user("alice"), make_user("bob")
+        await manager.connect_player_to_game(FakeWebSocket(), alice, game_id)
+        await manager.connect_spectator_to_game(
+            FakeWebSocket(fail=True), bob, game_id
+        )
+
+        await manager.broadcast_to_all(
+            game_id, NewWatcherEventDTO(event="new_watcher", data=[])
+        )
+        await manager.drain()
+
+        assert manager.get_users(game_id, "players") == [alice]
+        assert manager.get_users(game_id, "spectators") == []
+
+    async def test_churn_never_drops_healthy_sockets(self):
+        manager = GameWSManager()
+        game_id = uuid4()
+        rng = random.Random(7)
+        users = [make_user(f"user{i}") for i in range(50)]
+        current: dict[UUID, FakeWebSocket] = {}
+        for user in users:
+            current[user.id] = FakeWebSocket()
+            await manager.connect_spectator_to_game(
+                current[user.id], user, game_id
+            )
+
+        async def churn() -> None:
+            for _ in range(200):
+                user = rng.choice(users)
+                current[user.id].fail = True
+                current[user.id] = FakeWebSocket()
+                await manager.connect_spectator_to_game(
+                    current[user.id], user, game_id
+                )
+                await asyncio.sleep(0)
+
+        await asyncio.gather(
+            churn(),
+            *(
+                manager.send_frame_to_spectators(game_id, str(i))
+                for i in range(50)
+            ),
+        )
+        await manager.send_frame_to_spectators(game_id, "last")
+        await manager.drain()
+
+        assert manager.get_users(game_id, "spectators") == users
+        assert all(ws.frames[-1] == "last" for ws in current.values())
+
+    async def test_reconnect_to_other_game_leaves_old_game(self):
+        manager = GameWSManager()
+        old_game_id, new_game_id = uuid4(), uuid4()
+        alice = make_user("alice")
+        old_ws, new_ws = FakeWebSocket(), FakeWebSocket()
+        await manager.connect_player_to_game(old_ws, alice, old_game_id)
+        await manager.connect_player_to_game(new_ws, alice, new_game_id)
+
+        await manager.disconnect_player_from_game(
+            alice.id, old_game_id, old_ws
+        )
+
+        assert manager.get_users(old_game_id, "players") == []
+        assert manager.get_users(new_game_id, "players") == [alice]
+        await manager.send_frames_to_players(
+            new_game_id, {PUBLIC_VIEW: "snapshot"}
+        )
+        await manager.drain()
+        assert new_ws.frames == ["snapshot"]
+
+
+class TestLobbyWSManager:
+    async def test_stale_disconnect_keeps_new_connection(self):
+        manager = LobbyWSManager()
+        lobby_id = uuid4()
+        alice = make_user("alice")
+        old_ws, new_ws = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(old_ws, alice, lobby_id)
+        await manager.connect(new_ws, alice, lobby_id)
+
+        await manager.disconnect(alice.id, lobby_id, old_ws)
+
+        assert await manager.get_user_ids(lobby_id) == [alice.id]
+        await manager.send_to_user(
+            alice.id, ErrorEventDTO(event="error", data={"message": "x"})
+        )
+        await manager.drain()
+        assert len(new_ws.frames) == 2
+
+    async def test_reconnect_to_other_lobby_leaves_old_lobby(self):
+        manager = LobbyWSManager()
+        old_lobby_id, new_lobby_id = uuid4(), uuid4()
+        alice, bob = make_user("alice"), make_user("bob")
+        old_ws, new_ws = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(old_ws, alice, old_lobby_id)
+        await manager.connect(FakeWebSocket(), bob, old_lobby_id)
+        await manager.add_user_to_ready_list(bob.id, old_lobby_id)
+        await manager.connect(new_ws, alice, new_lobby_id)
+
+        await manager.disconnect(alice.id, old_lobby_id, old_ws)
+
+        assert await manager.get_user_ids(old_lobby_id) == [bob.id]
+        assert await manager.is_ready(old_lobby_id)
+        assert await manager.get_user_ids(new_lobby_id) == [alice.id]
+        await manager.send_to_user(
+            alice.id, ErrorEventDTO(event="error", data={"message": "x"})
+        )
+        await manager.drain()
+        assert '"event":"error"' in new_ws.frames[-1]
+
+    async def test_broadcast_disconnects_failed_sockets(self):
+        manager = LobbyWSManager()
+        lobby_id = uuid4()
+        alice, bob = make_user("alice"), make_user("bob")
+        alice_ws = FakeWebSocket()
+        await manager.connect(FakeWebSocket(fail=True), bob, lobby_id)
+        await manager.drain()
+        await manager.connect(alice_ws, alice, lobby_id)
+        await manager.drain()
+
+        assert await manager.get_user_ids(lobby_id) == [alice.id]
+        assert '"event":"lobby_members"' in alice_ws.frames[0]
+
+    async def test_broadcasts_game_start_event(self):
+        manager = LobbyWSManager()
+        lobby_id, game_id = uuid4(), uuid4()
+        alice_ws = FakeWebSocket()
+        await manager.connect(alice_ws, make_user("alice"), lobby_id)
+        event = GameStartEventDTO(
+            event="game_start", data=GameIdPayloadDTO(id=game_id)
+        )
+
+        await manager.broadcast(lobby_id, event)
+        await manager.drain()
+
+        assert alice_ws.frames[-1] == event.model_dump_json(by_alias=True)
+
+
+class TestLobbyCoalescing:
+    async def test_state_events_are_sent_once_per_tick(self):
+        manager = LobbyWSManager(tick=0.01)
+        lobby_id = uuid4()
+        users = [make_user(f"user{i}") for i in range(5)]
+        sockets = [FakeWebSocket() for _ in users]
+        for user, ws in zip(users, sockets):
+            await manager.connect(ws, user, lobby_id)
+        for user in users:
+            await manager.add_user_to_ready_list(user.id, lobby_id)
+            await manager.broadcast_ready_users(lobby_id)
+
+        await asyncio.sleep(0.02)
+        await manager.drain()
+
+        events = [json.loads(frame) for frame in sockets[0].frames]
+        assert [event["event"] for event in events] == [
+            "lobby_members",
+            "ready_users",
+        ]
+        assert len(events[0]["data"]) == 5
+        assert len(events[1]["data"]) == 5
+
+    async def test_other_events_send_held_states_first(self):
+        manager = LobbyWSManager(tick=60)
+        lobby_id = uuid4()
+        alice = make_user("alice")
+        alice_ws = FakeWebSocket()
+        await manager.connect(alice_ws, alice, lobby_id)
+
+        await manager.broadcast(lobby_id, {"event": "game_start"})
+        await manager.drain()
+
+        assert [json.loads(frame)["event"] for frame in alice_ws.frames] == [
+            "lobby_members",
+            "game_start",
+        ]
+
+
+class TestHeartbeat:
+    async def test_expires_silent_connections_from_rooms(self):
+        now = [0.0]
+        heartbeat = Heartbeat(interval=10, timeout=25, clock=lambda: now[0])
+        manager = LobbyWSManager(heartbeat=heartbeat)
+        lobby_id = uuid4()
+        alice, bob = make_user("alice"), make_user("bob")
+        alice_ws, bob_ws = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(alice_ws, alice, lobby_id)
+        await manager.connect(bob_ws, bob, lobby_id)
+        await manager.add_user_to_ready_list(alice.id, lobby_id)
+
+        now[0] = 10
+        assert heartbeat.beat() == 0
+        manager.touch(alice.id)
+        now[0] += 20
+        assert heartbeat.beat() == 1
+        await manager.drain()
+
+        assert await manager.get_user_ids(lobby_id) == [alice.id]
+        assert await manager.is_ready(lobby_id)
+        assert bob_ws.close_code == status.WS_1001_GOING_AWAY
+        assert alice_ws.frames.count('{"event":"ping"}') == 2
+
+    async def test_disabled_heartbeat_does_not_ping(self):
+        heartbeat = Heartbeat(interval=0, timeout=0)
+        manager = LobbyWSManager(heartbeat=heartbeat)
+        alice_ws = FakeWebSocket()
+        await manager.connect(alice_ws, make_user("alice"), uuid4())
+
+        await asyncio.sleep(0.01)
+        await manager.drain()
+
+        assert not heartbeat.is_enabled
+        assert '{"event":"ping"}' not in alice_ws.frames
@@ -0,0 +1,104 @@
+import json
+from datetime import datetime
+from uuid import uuid4
+
+from auth.schemas import UserInfoDTO
+from game.cards import SuitLiteral
+from game.projections import GameProjection
+from game.schemas import (
+    PUBLIC_VIEW,
+    FullCardInfoDTO,
+    FullGameCardInfoDTO,
+    FullGameCardInfoEventDTO,
+)
+from game.state import GameState
+
+
+def _user(username: str) -> UserInfoDTO:
+    return UserInfoDTO(
+        id=uuid4(),
+        username=username,
+        email=f"{username}@example.com",
+        elo=1000,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def _card(user: UserInfoDTO, suit: SuitLiteral, value: int) -> FullCardInfoDTO:
+    return FullCardInfoDTO(id=uuid4(), suit=suit, value=value, user_id=user.id)
+
+
+class TestGameProjection:
+    def setup_method(self):
+        self.alice, self.bob = _user("alice"), _user("bob")
+        self.a1 = _card(self.alice, "H", 10)
+        self.b1 = _card(self.bob, "H", 12)
+        self.state = GameState(
+            game_id=uuid4(),
+            round_id=uuid4(),
+            round_name="1",
+            round_number=1,
+            trump_suit="S",
+            trump_value=6,
+            opening_player_id=self.alice.id,
+            players=[self.alice, self.bob],
+            hands={self.alice.id: [self.a1], self.bob.id: [self.b1]},
+        )
+        self.projection = GameProjection()
+
+    def test_views_hide_other_hands(self):
+        views = self.projection.get_views(self.state)
+
+        assert set(views) == {PUBLIC_VIEW, self.alice.id, self.bob.id}
+        alice_view = json.loads(views[self.alice.id])
+        assert [len(u["cards"]) for u in alice_view["users"]] == [1, 0]
+        assert [u["cards_count"] for u in alice_view["users"]] == [1, 1]
+        public_view = json.loads(views[PUBLIC_VIEW])
+        assert [len(u["cards"]) for u in public_view["users"]] == [0, 0]
+
+    def test_views_are_cached_per_version(self):
+        views = self.projection.get_views(self.state)
+        assert self.projection.get_views(self.state) is views
+
+        self.state.place_bid(self.alice.id, 1)
+        assert self.projection.get_views(self.state) is not views
+
+    def test_frames_match_event_serialization(self):
+        frames = self.projection.get_frames(self.state, "game_is_finished", 7)
+
+        event = FullGameCardInfoEventDTO.model_validate_json(
+            frames[self.bob.id]
+        )
+        assert event.event == "game_is_finished"
+        assert event.seq == 7
+        assert event.model_dump_json(by_alias=True) == frames[self.bob.id]
+
+    def test_views_have_one_entry_per_player(self):
+        players = [_user(f"user{number}") for number in range(36)]
+        state = GameState(
+            game_id=uuid4(),
+            round_id=uuid4(),
+            round_name="BR",
+            round_number=1,
+            trump_suit="S",
+            trump_value=6,
+            opening_player_id=players[0].id,
+            players=players,
+            hands={
+                player.id: [_card(player, "H", 6 + number % 9)]
+                for number, player in enumerate(players)
+            },
+        )
+
+        views = self.projection.get_views(state)
+
+        game_info = state.to_dto()
+        for seat, player in enumerate(players):
+            view = FullGameCardInfoDTO.model_validate_json(views[player.id])
+            assert [user.id for user in view.users] == state.seats
+            assert view.users[seat] == game_info.users[seat]
+            assert views[player.id] == view.model_dump_json(by_alias=True)
+        public_view = FullGameCardInfoDTO.model_validate_json(
+            views[PUBLIC_VIEW]
+        )
+        assert all(not user.cards for user in public_view.users)
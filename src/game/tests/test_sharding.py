@@ -0,0 +1,166 @@
+import asyncio
+from collections import Counter
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import Request
+from fastapi.websockets import WebSocket
+
+import sharding
+from sharding import HashRing, ShardRouter, forward_request, forward_websocket
+
+
+class TestHashRing:
+    def test_keys_spread_over_nodes(self):
+        ring = HashRing(4)
+        owners = Counter(ring.get_node(str(uuid4())) for _ in range(4000))
+        assert set(owners) == {0, 1, 2, 3}
+        assert min(owners.values()) > 600
+
+    def test_adding_a_node_moves_only_its_share(self):
+        keys = [str(uuid4()) for _ in range(2000)]
+        before, after = HashRing(4), HashRing(5)
+        moved = [
+            key for key in keys if before.get_node(key) != after.get_node(key)
+        ]
+        assert all(after.get_node(key) == 4 for key in moved)
+        assert len(moved) < len(keys) * 0.35
+
+
+class TestShardRouter:
+    def test_disabled_router_owns_everything(self):
+        router = ShardRouter(0, [])
+        assert not router.is_enabled
+        assert router.is_local(uuid4())
+
+    def test_routes_to_owner_url(self):
+        urls = ["ws://127.0.0.1:8000", "ws://127.0.0.1:8001/"]
+        routers = [ShardRouter(shard_id, urls) for shard_id in range(2)]
+        game_id = uuid4()
+        owner = routers[0].get_owner(game_id)
+        assert [router.is_local(game_id) for router in routers] == [
+            shard_id == owner for shard_id in range(2)
+        ]
+        assert routers[1 - owner].get_url(game_id, f"/ws/games/{game_id}") == (
+            f"{urls[owner].rstrip('/')}/ws/games/{game_id}"
+        )
+
+
+class FakeUpstream:
+    def __init__(self, replies: list[str | bytes]) -> None:
+        self.replies = replies
+        self.sent: list[str | bytes] = []
+        self.closed = asyncio.Event()
+
+    async def send(self, data: str | bytes) -> None:
+        self.sent.append(data)
+
+    async def close(self) -> None:
+        self.closed.set()
+
+    async def __aiter__(self) -> AsyncIterator[str | bytes]:
+        for reply in self.replies:
+            yield reply
+        await self.closed.wait()
+
+
+class FakeClient(WebSocket):
+    def __init__(self, messages: list[dict[str, Any]], replies: int) -> None:
+        self.scope = {"type": "websocket", "headers": []}
+        self.messages = messages
+        self.replies = replies
+        self.sent: list[str | bytes] = []
+        self.received_all = asyncio.Event()
+        self.is_closed = False
+
+    async def receive(self) -> dict[str, Any]:
+        if self.messages:
+            return self.messages.pop(0)
+        await self.received_all.wait()
+        return {"type": "websocket.disconnect", "code": 1000}
+
+    async def send_text(self, data: str) -> None:
+        self._record(data)
+
+    async def send_bytes(self, data: bytes) -> None:
+        self._record(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.is_closed = True
+
+    def _record(self, data: str | bytes) -> None:
+        self.sent.append(data)
+        if len(self.sent) == self.replies:
+            self.received_all.set()
+
+
+class TestForwardWebSocket:
+    async def test_relays_text_and_bytes_frames(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        upstream = FakeUpstream(["state", b"\x02"])
+        client = FakeClient(
+            [
+                {"type": "websocket.receive", "text": "move"},
+                {"type": "websocket.receive", "bytes": b"\x01"},
+            ],
+            replies=2,
+        )
+
+        async def connect(url: str, **kwargs: Any) -> FakeUpstream:
+            return upstream
+
+        monkeypatch.setattr(sharding.websockets, "connect", connect)
+        await forward_websocket(client, "ws://shard")
+
+        assert upstream.sent == ["move", b"\x01"]
+        assert client.sent == ["state", b"\x02"]
+        assert upstream.closed.is_set()
+        assert not client.is_closed
+
+
+class TestForwardRequest:
+    async def test_proxies_request_to_http_url_of_owner(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        seen: list[httpx.Request] = []
+
+        def handle(request: httpx.Request) -> httpx.Response:
+            seen.append(request)
+            return httpx.Response(200, text="queue")
+
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.request", "body": b"{}"}
+
+        client_class = httpx.AsyncClient
+
+        def make_client() -> httpx.AsyncClient:
+            return client_class(transport=httpx.MockTransport(handle))
+
+        request = Request(
+            {
+                "type": "http",
+                "method": "POST",
+                "path": "/games/1/queue",
+                "query_string": b"full=1",
+                "headers": [
+                    (b"authorization", b"Bearer token"),
+                    (b"cookie", b"session"),
+                ],
+            },
+            receive,
+        )
+        monkeypatch.setattr(sharding.httpx, "AsyncClient", make_client)
+        response = await forward_request(
+            request, "ws://127.0.0.1:8001/games/1/queue"
+        )
+
+        assert response.status_code == 200
+        assert response.body == b"queue"
+        assert str(seen[0].url) == "http://127.0.0.1:8001/games/1/queue?full=1"
+        assert seen[0].method == "POST"
+        assert seen[0].content == b"{}"
+        assert seen[0].headers["authorization"] == "Bearer token"
+        assert "cookie" not in seen[0].headers
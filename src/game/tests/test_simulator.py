@@ -0,0 +1,46 @@
+from game import cards
+from game.schemas import SimulationResultDTO
+from game.simulator import BotPolicy, GreedyPolicy, RandomPolicy, Simulator
+
+
+class CheckingPolicy(GreedyPolicy):
+    def __init__(self) -> None:
+        self.moves = 0
+
+    def play(self, playable, trick, lead_suit, trump_suit):
+        index = super().play(playable, trick, lead_suit, trump_suit)
+        assert playable & (1 << index)
+        assert not trick & (1 << index)
+        self.moves += 1
+        return index
+
+
+class TestSimulator:
+    def test_same_seed_same_game(self):
+        def play(seed: int) -> SimulationResultDTO:
+            return Simulator([RandomPolicy(1), RandomPolicy(2)]).play_game(
+                seed
+            )
+
+        assert play(7) == play(7)
+
+    def test_every_card_is_played(self):
+        policies = [CheckingPolicy() for _ in range(3)]
+        result = Simulator(policies).play_game(3)
+
+        # 36 // 3 = 12 cards: 1 x3, 2..11, 12 x3, 11..2, 1 x3, BR x3, NTR x3
+        dealt = 3 + sum(range(2, 12)) * 2 + 12 * 3 + 3 + 12 * 6
+        assert sum(policy.moves for policy in policies) == dealt * 3
+        assert len(result.scores) == 3
+        assert max(result.scores) in [result.scores[i] for i in result.winners]
+        assert all(
+            result.elo_deltas[i] >= result.elo_deltas[j]
+            for i in result.winners
+            for j in range(3)
+        )
+
+    def test_random_policy_plays_playable_cards(self):
+        policy: BotPolicy = RandomPolicy(0)
+        playable = cards.SUIT_MASKS["H"] & 0b10110
+        for _ in range(20):
+            assert playable & (1 << policy.play(playable, 0, None, None))
@@ -0,0 +1,101 @@
+from uuid import UUID, uuid4
+
+from game.schemas import (
+    BidPlacedEventDTO,
+    BidPlacedPayloadDTO,
+    FullGameCardInfoDTO,
+    FullGameCardInfoEventDTO,
+    GameEventDTO,
+)
+from game.spectators import SpectatorFeed
+
+
+def make_bid_event(seq: int) -> BidPlacedEventDTO:
+    return BidPlacedEventDTO(
+        event="bid_placed",
+        seq=seq,
+        data=BidPlacedPayloadDTO(user_id=uuid4(), bid=1),
+    )
+
+
+def make_snapshot_event(seq: int) -> FullGameCardInfoEventDTO:
+    return FullGameCardInfoEventDTO(
+        event="full_game_card_info",
+        seq=seq,
+        data=FullGameCardInfoDTO(round_id=uuid4(), users=[]),
+    )
+
+
+class TestSpectatorFeed:
+    def setup_method(self):
+        self.now = 0.0
+        self.sent: list[tuple[UUID, str]] = []
+
+        async def send(game_id: UUID, frame: str) -> None:
+            self.sent.append((game_id, frame))
+
+        self.send = send
+        self.feed = SpectatorFeed(send, delay=10, clock=lambda: self.now)
+        self.game_id = uuid4()
+
+    async def test_releases_frames_after_delay(self):
+        event = make_bid_event(1)
+        self.feed.record(self.game_id, event)
+
+        self.now = 9
+        assert await self.feed.release_due() == 10
+        assert self.sent == []
+
+        self.now = 10
+        assert await self.feed.release_due() is None
+        assert self.sent == [
+            (self.game_id, event.model_dump_json(by_alias=True))
+        ]
+        assert self.feed.pending_count(self.game_id) == 0
+
+    async def test_released_frames_start_at_last_snapshot(self):
+        events: list[FullGameCardInfoEventDTO | GameEventDTO] = [
+            make_bid_event(1),
+            make_snapshot_event(2),
+            make_bid_event(3),
+        ]
+        for event in events:
+            self.feed.record(self.game_id, event)
+
+        self.now = 10
+        await self.feed.release_due()
+
+        assert self.feed.get_released(self.game_id) == [
+            event.model_dump_json(by_alias=True) for event in events[1:]
+        ]
+
+    async def test_overflow_keeps_newest_snapshot_and_later_deltas(self):
+        feed = SpectatorFeed(
+            self.send, delay=10, max_pending=3, clock=lambda: self.now
+        )
+        events: list[FullGameCardInfoEventDTO | GameEventDTO] = [
+            make_snapshot_event(1),
+            make_bid_event(2),
+            make_bid_event(3),
+            make_snapshot_event(4),
+            make_bid_event(5),
+        ]
+        for event in events[:3]:
+            feed.record(self.game_id, event)
+        feed.record(self.game_id, events[3])
+        assert feed.pending_count(self.game_id) == 1
+        feed.record(self.game_id, events[4])
+
+        self.now = 10
+        await feed.release_due()
+        assert [frame for _, frame in self.sent] == [
+            event.model_dump_json(by_alias=True) for event in events[3:]
+        ]
+
+    async def test_overflow_without_newer_snapshot_keeps_deltas(self):
+        feed = SpectatorFeed(
+            self.send, delay=10, max_pending=2, clock=lambda: self.now
+        )
+        for seq in range(1, 5):
+            feed.record(self.game_id, make_bid_event(seq))
+        assert feed.pending_count(self.game_id) == 4
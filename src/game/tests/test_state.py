@@ -0,0 +1,163 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from auth.schemas import UserInfoDTO
+from game.cards import SuitLiteral
+from game.exceptions import InvalidMoveError
+from game.schemas import (
+    CardPlayedEventDTO,
+    CardPlayedPayloadDTO,
+    FullCardInfoDTO,
+    GameStateSnapshotDTO,
+)
+from game.state import GameState, GameStateRegistry
+
+
+def _user(username: str) -> UserInfoDTO:
+    return UserInfoDTO(
+        id=uuid4(),
+        username=username,
+        email=f"{username}@example.com",
+        elo=1000,
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+def _card(user: UserInfoDTO, suit: SuitLiteral, value: int) -> FullCardInfoDTO:
+    return FullCardInfoDTO(id=uuid4(), suit=suit, value=value, user_id=user.id)
+
+
+class TestGameState:
+    def _make_state(self, *hands, trump_suit="S") -> GameState:
+        players = [user for user, _ in hands]
+        return GameState(
+            game_id=uuid4(),
+            round_id=uuid4(),
+            round_name=str(len(hands[0][1])),
+            round_number=1,
+            trump_suit=trump_suit,
+            trump_value=6,
+            opening_player_id=players[0].id,
+            players=players,
+            hands={user.id: cards for user, cards in hands},
+            bids={user.id: 1 for user in players},
+        )
+
+    def test_trick_winner_leads_next_trick(self):
+        alice, bob = _user("alice"), _user("bob")
+        a1, a2 = _card(alice, "H", 10), _card(alice, "D", 6)
+        b1, b2 = _card(bob, "H", 12), _card(bob, "C", 6)
+        state = self._make_state((alice, [a1, a2]), (bob, [b1, b2]))
+
+        first = state.play_card(alice.id, a1.id)
+        assert first.is_new_entry
+        assert first.owner_id == alice.id
+        second = state.play_card(bob.id, b1.id)
+        assert second.is_trick_finished
+        assert second.owner_id == bob.id
+        assert second.entry_id == first.entry_id
+        assert state.turn_id == bob.id
+
+        third = state.play_card(bob.id, b2.id)
+        assert third.is_new_entry
+        assert third.entry_id != first.entry_id
+        last = state.play_card(alice.id, a2.id)
+        assert last.is_round_finished
+        assert state.tricks_taken == {alice.id: 0, bob.id: 2}
+        assert state.scores == {alice.id: -10, bob.id: 2}
+
+    def test_trump_beats_lead_suit(self):
+        alice, bob = _user("alice"), _user("bob")
+        a1 = _card(alice, "H", 14)
+        b1 = _card(bob, "S", 6)
+        state = self._make_state((alice, [a1]), (bob, [b1]))
+        state.play_card(alice.id, a1.id)
+        result = state.play_card(bob.id, b1.id)
+        assert result.owner_id == bob.id
+
+    def test_not_your_turn(self):
+        alice, bob = _user("alice"), _user("bob")
+        a1, b1 = _card(alice, "H", 6), _card(bob, "H", 7)
+        state = self._make_state((alice, [a1]), (bob, [b1]))
+        with pytest.raises(InvalidMoveError):
+            state.play_card(bob.id, b1.id)
+
+    def test_must_follow_suit(self):
+        alice, bob = _user("alice"), _user("bob")
+        a1 = _card(alice, "H", 6)
+        b1, b2 = _card(bob, "D", 7), _card(bob, "H", 8)
+        state = self._make_state(
+            (alice, [a1, _card(alice, "C", 6)]), (bob, [b1, b2])
+        )
+        state.play_card(alice.id, a1.id)
+        with pytest.raises(InvalidMoveError):
+            state.play_card(bob.id, b1.id)
+        assert state.play_card(bob.id, b2.id).owner_id == bob.id
+
+    def test_snapshot(self):
+        alice, bob = _user("alice"), _user("bob")
+        a1, b1 = _card(alice, "H", 6), _card(bob, "H", 7)
+        state = self._make_state((alice, [a1]), (bob, [b1]))
+        state.play_card(alice.id, a1.id)
+        snapshot = state.to_dto()
+        assert [user.id for user in snapshot.users] == [alice.id, bob.id]
+        assert snapshot.users[0].cards == []
+        assert snapshot.users[1].cards == [b1]
+        assert snapshot.entry is not None
+        assert [card.id for card in snapshot.entry.cards] == [a1.id]
+
+    def test_cards_per_player(self):
+        alice, bob = _user("alice"), _user("bob")
+        state = self._make_state(
+            (alice, [_card(alice, "H", 10), _card(alice, "D", 6)]),
+            (bob, [_card(bob, "H", 12), _card(bob, "C", 6)]),
+        )
+        assert state.cards_per_player == 2
+
+        state = self._make_state((alice, []), (bob, []))
+        state.round_name = "BR"
+        assert state.cards_per_player == 18
+
+    def test_snapshot_replay(self):
+        alice, bob = _user("alice"), _user("bob")
+        a1, a2 = _card(alice, "H", 10), _card(alice, "D", 6)
+        b1, b2 = _card(bob, "H", 12), _card(bob, "C", 6)
+        state = self._make_state((alice, [a1, a2]), (bob, [b1, b2]))
+        state.play_card(alice.id, a1.id)
+        snapshot = GameStateSnapshotDTO.model_validate_json(
+            state.to_snapshot().model_dump_json()
+        )
+
+        events = []
+        for seq, (user, card) in enumerate([(bob, b1), (bob, b2)], 1):
+            result = state.play_card(user.id, card.id)
+            events.append(
+                CardPlayedEventDTO(
+                    event="card_played",
+                    seq=seq,
+                    data=CardPlayedPayloadDTO(
+                        card=result.card, owner_id=result.owner_id
+                    ),
+                )
+            )
+
+        restored = GameState.from_snapshot(snapshot)
+        for event in events:
+            restored.apply_event(event)
+        assert restored.to_dto() == state.to_dto()
+        assert restored.tricks_taken == state.tricks_taken
+        assert restored.turn_id == state.turn_id
+
+
+class TestGameStateRegistry:
+    def test_sequence_survives_discard(self):
+        registry = GameStateRegistry()
+        game_id = uuid4()
+        assert registry.next_sequence(game_id) == 1
+        assert registry.next_sequence(game_id) == 2
+        registry.discard(game_id)
+        assert registry.get_sequence(game_id) == 2
+        registry.forget(game_id)
+        assert registry.get_sequence(game_id) == 0
@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+
+from game.write_behind import WriteBehindQueue
+from unitofwork import IUnitOfWork
+
+
+class FakeUnitOfWork(IUnitOfWork):
+    def __init__(self, failures: list[bool], written: list[str]) -> None:
+        self.failures = failures
+        self.written = written
+        self.pending: list[str] = []
+
+    async def __aenter__(self) -> "FakeUnitOfWork":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.pending = []
+
+    async def commit(self) -> None:
+        if self.failures and self.failures.pop(0):
+            raise OSError("connection lost")
+        self.written.extend(self.pending)
+
+    async def rollback(self) -> None:
+        self.pending = []
+
+
+def make_write(name: str) -> Any:
+    async def write(uow: FakeUnitOfWork) -> None:
+        uow.pending.append(name)
+
+    return write
+
+
+class TestWriteBehindQueue:
+    def setup_method(self) -> None:
+        self.written: list[str] = []
+        self.failed: list[UUID] = []
+        self.game_id = uuid4()
+
+    def make_queue(self, failures: list[bool]) -> WriteBehindQueue:
+        async def on_failure(game_id: UUID) -> None:
+            self.failed.append(game_id)
+
+        return WriteBehindQueue(
+            lambda: FakeUnitOfWork(failures, self.written),
+            delay=0.001,
+            max_retries=2,
+            on_failure=on_failure,
+        )
+
+    async def test_failed_flush_keeps_writes_in_order(self) -> None:
+        queue = self.make_queue([True])
+        queue.push(self.game_id, make_write("first"))
+
+        with pytest.raises(OSError):
+            await queue.flush(self.game_id)
+        queue.push(self.game_id, make_write("second"))
+        await queue.flush(self.game_id)
+
+        assert self.written == ["first", "second"]
+        assert self.failed == []
+
+    async def test_background_flush_is_retried(self) -> None:
+        queue = self.make_queue([True, True])
+        queue.push(self.game_id, make_write("move"))
+
+        while queue.pending_count(self.game_id):
+            await asyncio.sleep(0.001)
+
+        assert self.written == ["move"]
+        assert self.failed == []
+
+    async def test_writes_are_dropped_after_retries(self) -> None:
+        queue = self.make_queue([True, True, True])
+        queue.push(self.game_id, make_write("move"))
+
+        while not self.failed:
+            await asyncio.sleep(0.001)
+
+        assert self.written == []
+        assert queue.pending_count(self.game_id) == 0
+        assert self.failed == [self.game_id]
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+from uuid import UUID
+
+from game.state import game_states
+from unitofwork import IUnitOfWork, UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[IUnitOfWork], Awaitable[None]]
+
+
+class WriteBehindQueue:
+    """
+    Collects database writes per game and flushes them in one transaction
+    in the background, so moves don't wait for the database.
+
+    Writes of a game are always applied in the order they were pushed. A
+    failed flush keeps its writes at the front of the queue and is retried
+    with a doubling delay. After ``max_retries`` retries the writes are
+    dropped, the cached state of the game is discarded and ``on_failure``
+    is called, so the clients can be sent the state of the database.
+    """
+
+    def __init__(
+        self,
+        uow_factory: Callable[[], IUnitOfWork] = UnitOfWork,
+        delay: float = 0.05,
+        max_retries: int = 3,
+        on_failure: Callable[[UUID], Awaitable[None]] | None = None,
+    ) -> None:
+        self._uow_factory = uow_factory
+        self._delay = delay
+        self._max_retries = max_retries
+        self.on_failure = on_failure
+        self._ops: dict[UUID, list[WriteOp]] = {}
+        self._tasks: dict[UUID, asyncio.Task] = {}
+        self._locks: dict[UUID, asyncio.Lock] = {}
+
+    def push(self, game_id: UUID, *ops: WriteOp) -> None:
+        self._ops.setdefault(game_id, []).extend(ops)
+        self._schedule(game_id)
+
+    def pending_count(self, game_id: UUID) -> int:
+        return len(self._ops.get(game_id, []))
+
+    async def flush(self, game_id: UUID) -> None:
+        async with self._locks.setdefault(game_id, asyncio.Lock()):
+            ops = self._ops.pop(game_id, [])
+            if not ops:
+                return
+            try:
+                uow = self._uow_factory()
+                async with uow:
+                    for op in ops:
+                        await op(uow)
+                    await uow.commit()
+            except BaseException:
+                self._ops[game_id] = ops + self._ops.get(game_id, [])
+                self._schedule(game_id)
+                raise
+
+    def _schedule(self, game_id: UUID, attempt: int = 0) -> None:
+        if game_id not in self._tasks:
+            self._tasks[game_id] = asyncio.create_task(
+                self._delayed_flush(game_id, attempt)
+            )
+
+    async def _delayed_flush(self, game_id: UUID, attempt: int) -> None:
+        await asyncio.sleep(self._delay * 2**attempt)
+        try:
+            await self.flush(game_id)
+        except Exception:
+            del self._tasks[game_id]
+            if attempt < self._max_retries:
+                logger.warning(
+                    "Write-behind flush failed for game %s, retrying",
+                    game_id,
+                    exc_info=True,
+                )
+                self._schedule(game_id, attempt + 1)
+                return
+            logger.exception(
+                "Write-behind flush failed for game %s, dropping %d writes",
+                game_id,
+                self.pending_count(game_id),
+            )
+            self._ops.pop(game_id, None)
+            game_states.discard(game_id)
+            if self.on_failure is not None:
+                await self.on_failure(game_id)
+            return
+        del self._tasks[game_id]
+        if self._ops.get(game_id):
+            self._schedule(game_id)
+
+
+write_behind_queue = WriteBehindQueue()
@@ -1,23 +1,258 @@
 import asyncio
-from uuid import UUID
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Literal
+from uuid import UUID, uuid4
 
-from fastapi.encoders import jsonable_encoder
+from fastapi import status
 from fastapi.websockets import WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+from pydantic_core import to_json
 
 from auth.schemas import UserInfoDTO
+from broker import Broker, InProcessBroker, Message, broker
+from config import (
+    WS_COALESCE_TICK,
+    WS_PING_INTERVAL,
+    WS_PING_TIMEOUT,
+    WS_QUEUE_POLICY,
+    WS_QUEUE_SIZE,
+)
 from game.schemas import (
-    BidEventDTO,
+    PUBLIC_VIEW,
     FullGameCardInfoEventDTO,
+    GameEventDTO,
+    GameStartEventDTO,
     NewWatcherEventDTO,
+    ViewerId,
 )
 from notification.schemas import FriendEventDTO, LobbyEventDTO
 from schemas import ErrorEventDTO
 
+QueuePolicy = Literal["drop", "coalesce", "evict"]
+
+PING_FRAME = '{"event":"ping"}'
+# Asks the client to send a ``sync`` event to get its own snapshot
+REFRESH_FRAME = '{"event":"refresh"}'
+
+
+class Connection:
+    """
+    Outbound side of a WebSocket.
+
+    Frames are queued without waiting and written in order by the writer
+    task of the connection, so a slow client only fills its own queue and
+    never delays the other clients of a room. When the queue is full the
+    policy decides: ``drop`` skips the new frame, ``coalesce`` replaces the
+    queued frame of the same kind (and drops frames without a kind),
+    ``evict`` closes the connection.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_close: Callable[[], Awaitable[None]],
+        max_queue_size: int = WS_QUEUE_SIZE,
+        policy: QueuePolicy = WS_QUEUE_POLICY,
+    ) -> None:
+        self.websocket = websocket
+        self._on_close = on_close
+        self._max_queue_size = max_queue_size
+        self._policy = policy
+        self._frames: deque[tuple[str | None, str]] = deque()
+        self._ready = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._is_evicted = False
+        self.last_seen = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        self._expire_task: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._frames)
+
+    def send(self, frame: str, kind: str | None = None) -> bool:
+        """
+        Queue the frame, return whether it was queued.
+        """
+        if self._is_evicted or self._task.done():
+            return False
+        if len(self._frames) >= self._max_queue_size:
+            if self._policy == "evict":
+                self._is_evicted = True
+                self._frames.clear()
+                self._ready.set()
+                return False
+            if self._policy == "drop" or not self._remove_kind(kind):
+                return False
+        self._frames.append((kind, frame))
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    async def drain(self) -> None:
+        """
+        Wait until the queued frames are written.
+        """
+        await self._idle.wait()
+
+    def expire(self) -> None:
+        """
+        Drop a connection whose client stopped answering.
+
+        The writer may be stuck on the socket, so the connection is
+        unregistered at once and the socket is closed without waiting.
+        """
+        if self._is_evicted:
+            return
+        self._is_evicted = True
+        self.close()
+        self._expire_task = asyncio.create_task(self._expire())
+
+    def close(self) -> None:
+        """
+        Stop the writer and the expiry, the socket itself belongs to its
+        endpoint.
+        """
+        self._frames.clear()
+        self._idle.set()
+        current_task = asyncio.current_task()
+        for task in (self._task, self._expire_task):
+            if task is not None and task is not current_task:
+                task.cancel()
+
+    async def _expire(self) -> None:
+        await self._on_close()
+        try:
+            await asyncio.wait_for(
+                self.websocket.close(code=status.WS_1001_GOING_AWAY),
+                WS_PING_INTERVAL,
+            )
+        except (asyncio.TimeoutError, WebSocketDisconnect, RuntimeError):
+            pass
+
+    def _remove_kind(self, kind: str | None) -> bool:
+        if kind is None:
+            return False
+        for queued in self._frames:
+            if queued[0] == kind:
+                self._frames.remove(queued)
+                return True
+        return False
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                if self._is_evicted:
+                    await self.websocket.close(
+                        code=status.WS_1013_TRY_AGAIN_LATER
+                    )
+                    break
+                if not self._frames:
+                    self._ready.clear()
+                    self._idle.set()
+                    continue
+                _, frame = self._frames.popleft()
+                await self.websocket.send_text(frame)
+        except (WebSocketDisconnect, RuntimeError):
+            pass
+        self._frames.clear()
+        await self._on_close()
+        self._idle.set()
+
+
+class Heartbeat:
+    """
+    Pings every connection of the managers and expires the ones silent for
+    longer than ``timeout``, from a single task for all sockets.
+
+    Any message of a client counts as an answer, see ``WSManager.touch``.
+    Half-open sockets are already closed by the protocol-level pings of
+    uvicorn, this heartbeat is for clients answering ``{"event": "pong"}``
+    and is off with a ``timeout`` of 0.
+    """
+
+    def __init__(
+        self,
+        interval: float = WS_PING_INTERVAL,
+        timeout: float = WS_PING_TIMEOUT,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._interval = interval
+        self._timeout = timeout
+        self.clock = clock
+        self._managers: list["WSManager"] = []
+        self._task: asyncio.Task | None = None
+
+    def add(self, manager: "WSManager") -> None:
+        self._managers.append(manager)
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._timeout > 0
+
+    def start(self) -> None:
+        if not self.is_enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    def beat(self) -> int:
+        """
+        Ping the connections and return the number of expired ones.
+        """
+        deadline = self.clock() - self._timeout
+        return sum(manager.ping(deadline) for manager in self._managers)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            self.beat()
+
 
 class WSManager:
-    def __init__(self) -> None:
-        self._connections: dict[UUID, WebSocket] = {}
-        self._lock = asyncio.Lock()
+    """
+    Registry of the WebSocket connections and rooms of one endpoint.
+
+    The registry is only touched by the event loop thread and never awaits
+    in the middle of an update, so every update is atomic and needs no
+    lock: rooms never wait for each other, and sends only queue frames on
+    the connections.
+
+    Sends are published on the channel of the manager and every worker
+    delivers them to the sockets connected to it, see ``broker``.
+
+    With a ``tick`` the ``STATE_EVENTS`` of a room are held for up to one
+    tick and only the latest of each is sent, any other event of the room
+    sends the held ones first to keep the order.
+    """
+
+    CHANNEL = "ws"
+    # Events carrying a whole state, a newer one replaces an older one
+    STATE_EVENTS: frozenset[str] = frozenset()
+
+    def __init__(
+        self,
+        broker: Broker | None = None,
+        heartbeat: Heartbeat | None = None,
+        max_queue_size: int = WS_QUEUE_SIZE,
+        policy: QueuePolicy = WS_QUEUE_POLICY,
+        tick: float = WS_COALESCE_TICK,
+    ) -> None:
+        self._broker = broker or InProcessBroker()
+        self._tick = tick
+        self._held: dict[UUID, dict[str, Message]] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._heartbeat = heartbeat
+        if heartbeat is not None:
+            heartbeat.add(self)
+        self._is_subscribed = False
+        self._subscribe_lock = asyncio.Lock()
+        self._max_queue_size = max_queue_size
+        self._policy = policy
+        self._connections: dict[UUID, Connection] = {}
 
     async def send_to_user(
         self,
@@ -27,33 +262,168 @@ class WSManager:
         | FullGameCardInfoEventDTO
         | ErrorEventDTO,
     ) -> None:
-        async with self._lock:
-            ws = self._connections.get(user_id)
-        if ws:
-            try:
-                await ws.send_json(
-                    jsonable_encoder(data.model_dump(by_alias=True))
-                )
-            except (WebSocketDisconnect, RuntimeError):
-                await self.disconnect(user_id)
+        await self.send_frame_to_user(
+            user_id, data.model_dump_json(by_alias=True)
+        )
+
+    async def send_frame_to_user(
+        self, user_id: UUID, frame: str, kind: str | None = None
+    ) -> None:
+        """
+        Send an already serialized message to a user, at once when the
+        user is connected to this worker, so frames private to the user
+        such as a hand stay off the broker channel.
+        """
+        connection = self._connections.get(user_id)
+        if connection:
+            connection.send(frame, kind)
+            return
+        await self._broker.publish(
+            self.CHANNEL,
+            {"user_id": str(user_id), "frame": frame, "kind": kind},
+        )
+
+    async def disconnect(
+        self, user_id: UUID, *, websocket: WebSocket | None = None
+    ) -> None:
+        if self._owns(user_id, websocket):
+            self._remove(user_id)
+
+    def touch(self, user_id: UUID) -> None:
+        """
+        Mark the connection of the user alive, call on every message.
+        """
+        connection = self._connections.get(user_id)
+        if connection:
+            connection.last_seen = self._now()
+
+    def ping(self, deadline: float) -> int:
+        """
+        Expire connections not seen since ``deadline``, ping the others
+        and return the number of expired connections.
+        """
+        expired = 0
+        for connection in list(self._connections.values()):
+            if connection.last_seen < deadline:
+                connection.expire()
+                expired += 1
+            else:
+                connection.send(PING_FRAME, "ping")
+        return expired
+
+    def get_queue_depth(self, user_id: UUID) -> int:
+        connection = self._connections.get(user_id)
+        return connection.queue_depth if connection else 0
+
+    async def drain(self) -> None:
+        """
+        Wait until the frames queued on every connection are written.
+        """
+        await asyncio.gather(
+            *(connection.drain() for connection in self._connections.values())
+        )
+
+    async def _add(
+        self,
+        user_id: UUID,
+        websocket: WebSocket,
+        on_close: Callable[[], Awaitable[None]],
+    ) -> None:
+        if not self._is_subscribed:
+            await self._subscribe()
+        if self._heartbeat is not None:
+            self._heartbeat.start()
+        self._remove(user_id)
+        connection = self._connections[user_id] = Connection(
+            websocket, on_close, self._max_queue_size, self._policy
+        )
+        connection.last_seen = self._now()
 
-    async def disconnect(self, user_id: UUID) -> None:
-        async with self._lock:
-            self._connections.pop(user_id, None)
+    async def _subscribe(self) -> None:
+        async with self._subscribe_lock:
+            if not self._is_subscribed:
+                await self._broker.subscribe(self.CHANNEL, self._deliver)
+                self._is_subscribed = True
+
+    def _remove(self, user_id: UUID) -> None:
+        connection = self._connections.pop(user_id, None)
+        if connection:
+            connection.close()
+
+    async def _publish_to_room(self, room_id: UUID, message: Message) -> None:
+        kind = message["kind"]
+        if self._tick and kind in self.STATE_EVENTS:
+            self._held.setdefault(room_id, {})[kind] = message
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.create_task(self._flush_held())
+            return
+        for held in self._held.pop(room_id, {}).values():
+            await self._broker.publish(self.CHANNEL, held)
+        await self._broker.publish(self.CHANNEL, message)
+
+    async def _flush_held(self) -> None:
+        while self._held:
+            await asyncio.sleep(self._tick)
+            held, self._held = self._held, {}
+            for messages in held.values():
+                for message in messages.values():
+                    await self._broker.publish(self.CHANNEL, message)
+
+    def _now(self) -> float:
+        if self._heartbeat is None:
+            return time.monotonic()
+        return self._heartbeat.clock()
+
+    def _deliver(self, message: Message) -> None:
+        """
+        Queue a published message on the local sockets it is sent to.
+        """
+        connection = self._connections.get(UUID(message["user_id"]))
+        if connection:
+            connection.send(message["frame"], message["kind"])
+
+    def _owns(self, user_id: UUID, websocket: WebSocket | None) -> bool:
+        """
+        Whether ``websocket`` is still the connection of the user.
+
+        A reconnect replaces the connection of the user, so the cleanup of
+        the old socket must not remove the new one. ``None`` matches any
+        connection.
+        """
+        if websocket is None:
+            return True
+        connection = self._connections.get(user_id)
+        return connection is not None and connection.websocket is websocket
 
 
 class NotificationWSManager(WSManager):
+    CHANNEL = "ws_notifications"
+
     async def connect(self, user_id: UUID, websocket: WebSocket) -> None:
         await websocket.accept()
-        async with self._lock:
-            self._connections[user_id] = websocket
+        await self._add(
+            user_id,
+            websocket,
+            lambda: self.disconnect(user_id, websocket=websocket),
+        )
 
 
 class LobbyWSManager(WSManager):
-    def __init__(self) -> None:
-        super().__init__()
+    STATE_EVENTS = frozenset(("lobby_members", "ready_users"))
+    CHANNEL = "ws_lobbies"
+
+    def __init__(
+        self,
+        broker: Broker | None = None,
+        heartbeat: Heartbeat | None = None,
+        max_queue_size: int = WS_QUEUE_SIZE,
+        policy: QueuePolicy = WS_QUEUE_POLICY,
+        tick: float = WS_COALESCE_TICK,
+    ) -> None:
+        super().__init__(broker, heartbeat, max_queue_size, policy, tick)
         self._lobby_members: dict[UUID, dict[UUID, UserInfoDTO]] = {}
         self._lobby_ready: dict[UUID, set[UUID]] = {}
+        self._user_lobbies: dict[UUID, UUID] = {}
 
     async def connect(
         self, websocket: WebSocket, user: UserInfoDTO, lobby_id: UUID
@@ -62,10 +432,14 @@ class LobbyWSManager(WSManager):
         Accept a WebSocket connection and register the user to the lobby room.
         """
         await websocket.accept()
-        async with self._lock:
-            self._connections[user.id] = websocket
-            self._lobby_members.setdefault(lobby_id, {})[user.id] = user
-            self._lobby_ready.setdefault(lobby_id, set())
+        await self._add(
+            user.id,
+            websocket,
+            lambda: self.disconnect(user.id, lobby_id, websocket),
+        )
+        self._user_lobbies[user.id] = lobby_id
+        self._lobby_members.setdefault(lobby_id, {})[user.id] = user
+        self._lobby_ready.setdefault(lobby_id, set())
         await self.broadcast(
             lobby_id,
             {
@@ -78,25 +452,35 @@ class LobbyWSManager(WSManager):
         )
 
     async def disconnect(
-        self, user_id: UUID, lobby_id: UUID | None = None
-    ) -> None:
-        async with self._lock:
-            self._connections.pop(user_id, None)
-            if lobby_id:
-                if lobby_id in self._lobby_members:
-                    self._lobby_members[lobby_id].pop(user_id, None)
-                    if user_id in self._lobby_ready.get(lobby_id, set()):
-                        self._lobby_ready[lobby_id].discard(user_id)
-                    if not self._lobby_members[lobby_id]:
-                        self._lobby_members.pop(lobby_id)
+        self,
+        user_id: UUID,
+        lobby_id: UUID | None = None,
+        websocket: WebSocket | None = None,
+    ) -> None:
+        """
+        Remove the user from the lobby, and drop the connection if it is
+        still ``websocket``. A user that reconnected to the same lobby
+        keeps the membership of the new connection.
+        """
+        if self._owns(user_id, websocket):
+            self._remove(user_id)
+            self._user_lobbies.pop(user_id, None)
+        elif self._user_lobbies.get(user_id) == lobby_id:
+            return
+        if lobby_id:
+            if lobby_id in self._lobby_members:
+                self._lobby_members[lobby_id].pop(user_id, None)
+                if user_id in self._lobby_ready.get(lobby_id, set()):
+                    self._lobby_ready[lobby_id].discard(user_id)
+                if not self._lobby_members[lobby_id]:
+                    self._lobby_members.pop(lobby_id)
 
     async def add_user_to_ready_list(
         self, user_id: UUID, lobby_id: UUID
     ) -> None:
-        async with self._lock:
-            if lobby_id not in self._lobby_ready:
-                self._lobby_ready[lobby_id] = set()
-            self._lobby_ready[lobby_id].add(user_id)
+        if lobby_id not in self._lobby_ready:
+            self._lobby_ready[lobby_id] = set()
+        self._lobby_ready[lobby_id].add(user_id)
 
     async def broadcast_ready_users(self, lobby_id: UUID) -> None:
         await self.broadcast(
@@ -108,41 +492,56 @@ class LobbyWSManager(WSManager):
         )
 
     async def broadcast(
-        self, lobby_id: UUID, data: dict[str, str | set[str]]
+        self, lobby_id: UUID, data: dict[str, Any] | GameStartEventDTO
     ) -> None:
         """
         Send a message to all users connected in a given lobby.
         """
-        payload = jsonable_encoder(data)
-        async with self._lock:
-            websockets = [
-                self._connections.get(uid)
-                for uid in self._lobby_members.get(lobby_id, {}).keys()
-            ]
-        coroutines = [ws.send_json(payload) for ws in websockets if ws]
-        results = await asyncio.gather(*coroutines, return_exceptions=True)
-        for i, result in enumerate(results):
-            if isinstance(result, (WebSocketDisconnect, RuntimeError)):
-                failed_user = list(
-                    self._lobby_members.get(lobby_id, {}).keys()
-                )[i]
-                await self.disconnect(failed_user, lobby_id)
+        if isinstance(data, BaseModel):
+            frame = data.model_dump_json(by_alias=True)
+            event = data.event
+        else:
+            frame = to_json(data).decode()
+            event = data["event"]
+        kind = event if event in self.STATE_EVENTS else None
+        await self._publish_to_room(
+            lobby_id,
+            {"lobby_id": str(lobby_id), "frame": frame, "kind": kind},
+        )
+
+    def _deliver(self, message: Message) -> None:
+        if "lobby_id" not in message:
+            return super()._deliver(message)
+        for uid in self._lobby_members.get(UUID(message["lobby_id"]), {}):
+            connection = self._connections.get(uid)
+            if connection:
+                connection.send(message["frame"], message["kind"])
 
     async def get_user_ids(self, lobby_id: UUID) -> list[UUID]:
-        async with self._lock:
-            return list(self._lobby_members.get(lobby_id, {}).keys())
+        return list(self._lobby_members.get(lobby_id, {}).keys())
 
     async def is_ready(self, lobby_id: UUID) -> bool:
-        async with self._lock:
-            return lobby_id in self._lobby_ready and len(
-                self._lobby_ready[lobby_id]
-            ) == len(self._lobby_members.get(lobby_id, {}))
+        return lobby_id in self._lobby_ready and len(
+            self._lobby_ready[lobby_id]
+        ) == len(self._lobby_members.get(lobby_id, {}))
 
 
 class GameWSManager(WSManager):
-    def __init__(self) -> None:
-        super().__init__()
+    STATE_EVENTS = frozenset(("new_watcher",))
+    CHANNEL = "ws_games"
+
+    def __init__(
+        self,
+        broker: Broker | None = None,
+        heartbeat: Heartbeat | None = None,
+        max_queue_size: int = WS_QUEUE_SIZE,
+        policy: QueuePolicy = WS_QUEUE_POLICY,
+        tick: float = WS_COALESCE_TICK,
+    ) -> None:
+        super().__init__(broker, heartbeat, max_queue_size, policy, tick)
+        self._id = uuid4().hex
         self._games: dict[UUID, dict[str, dict[UUID, UserInfoDTO]]] = {}
+        self._user_games: dict[UUID, tuple[UUID, str]] = {}
 
     async def connect_player_to_game(
         self, websocket: WebSocket, user: UserInfoDTO, game_id: UUID
@@ -157,54 +556,78 @@ class GameWSManager(WSManager):
         )
 
     async def disconnect_player_from_game(
-        self, user_id: UUID, game_id: UUID
+        self,
+        user_id: UUID,
+        game_id: UUID,
+        websocket: WebSocket | None = None,
     ) -> None:
-        await self._disconnect_user_from_game(user_id, game_id, "players")
+        await self._disconnect_user_from_game(
+            user_id, game_id, "players", websocket
+        )
 
     async def disconnect_spectator_from_game(
-        self, user_id: UUID, game_id: UUID
+        self,
+        user_id: UUID,
+        game_id: UUID,
+        websocket: WebSocket | None = None,
     ) -> None:
-        await self._disconnect_user_from_game(user_id, game_id, "spectators")
+        await self._disconnect_user_from_game(
+            user_id, game_id, "spectators", websocket
+        )
 
     async def broadcast_to_all(
-        self, game_id: UUID, data: NewWatcherEventDTO | BidEventDTO
+        self,
+        game_id: UUID,
+        data: NewWatcherEventDTO | FullGameCardInfoEventDTO | GameEventDTO,
     ) -> None:
         """
         Send a message to all users connected in a given game.
         """
-        payload = jsonable_encoder(data.model_dump(by_alias=True))
-        async with self._lock:
-            websockets = [
-                self._connections.get(uid)
-                for uid in self._games.get(game_id, {})
-                .get("players", {})
-                .keys()
-            ] + [
-                self._connections.get(uid)
-                for uid in self._games.get(game_id, {})
-                .get("spectators", {})
-                .keys()
-            ]
-        coroutines = [ws.send_json(payload) for ws in websockets if ws]
-        results = await asyncio.gather(*coroutines, return_exceptions=True)
-        for i, result in enumerate(results):
-            if isinstance(result, (WebSocketDisconnect, RuntimeError)):
-                try:
-                    failed_user = list(
-                        self._games.get(game_id, {}).get("players", {}).keys()
-                    )[i]
-                    await self.disconnect_player_from_game(
-                        failed_user, game_id
-                    )
-                except IndexError:
-                    failed_user = list(
-                        self._games.get(game_id, {})
-                        .get("spectators", {})
-                        .keys()
-                    )[i - len(self._games.get(game_id, {}).get("players", {}))]
-                    await self.disconnect_spectator_from_game(
-                        failed_user, game_id
-                    )
+        frame = data.model_dump_json(by_alias=True)
+        await self._send_frames_to_lists(
+            game_id,
+            ("players", "spectators"),
+            {PUBLIC_VIEW: frame},
+            self._get_kind(data),
+        )
+
+    async def broadcast_to_players(
+        self, game_id: UUID, data: FullGameCardInfoEventDTO | GameEventDTO
+    ) -> None:
+        """
+        Send a message to the players of a given game only.
+        """
+        await self._send_frames_to_lists(
+            game_id,
+            ("players",),
+            {PUBLIC_VIEW: data.model_dump_json(by_alias=True)},
+            self._get_kind(data),
+        )
+
+    async def send_frames_to_players(
+        self, game_id: UUID, frames: dict[ViewerId, str]
+    ) -> None:
+        """
+        Send every player its own snapshot frame, players without a frame
+        get the ``PUBLIC_VIEW`` one.
+
+        Own frames are queued on the sockets of this worker and never
+        published, the players connected to another worker get a
+        ``REFRESH_FRAME`` instead.
+        """
+        await self._send_frames_to_lists(
+            game_id, ("players",), frames, "snapshot"
+        )
+
+    async def send_frame_to_spectators(
+        self, game_id: UUID, frame: str
+    ) -> None:
+        """
+        Send an already serialized message to all spectators of a game.
+        """
+        await self._send_frames_to_lists(
+            game_id, ("spectators",), {PUBLIC_VIEW: frame}
+        )
 
     def get_users(self, game_id: UUID, list_name: str) -> list[UserInfoDTO]:
         """
@@ -212,6 +635,56 @@ class GameWSManager(WSManager):
         """
         return list(self._games.get(game_id, {}).get(list_name, {}).values())
 
+    @staticmethod
+    def _get_kind(
+        data: NewWatcherEventDTO | FullGameCardInfoEventDTO | GameEventDTO,
+    ) -> str | None:
+        if isinstance(data, FullGameCardInfoEventDTO):
+            return "snapshot"
+        if isinstance(data, NewWatcherEventDTO):
+            return data.event
+        return None
+
+    async def _send_frames_to_lists(
+        self,
+        game_id: UUID,
+        list_names: tuple[str, ...],
+        frames: dict[ViewerId, str],
+        kind: str | None = None,
+    ) -> None:
+        private = [uid for uid in frames if uid != PUBLIC_VIEW]
+        for uid in private:
+            connection = self._connections.get(uid)
+            if connection:
+                connection.send(frames[uid], kind)
+        await self._publish_to_room(
+            game_id,
+            {
+                "game_id": str(game_id),
+                "list_names": list_names,
+                "frame": frames[PUBLIC_VIEW],
+                "private": [str(uid) for uid in private],
+                "sender": self._id,
+                "kind": kind,
+            },
+        )
+
+    def _deliver(self, message: Message) -> None:
+        if "game_id" not in message:
+            return super()._deliver(message)
+        game = self._games.get(UUID(message["game_id"]), {})
+        private = set(message["private"])
+        is_own = message["sender"] == self._id
+        for list_name in message["list_names"]:
+            for uid in game.get(list_name, {}):
+                connection = self._connections.get(uid)
+                if not connection:
+                    continue
+                if str(uid) not in private:
+                    connection.send(message["frame"], message["kind"])
+                elif not is_own:
+                    connection.send(REFRESH_FRAME, "refresh")
+
     async def _connect_user_to_game(
         self,
         websocket: WebSocket,
@@ -220,25 +693,44 @@ class GameWSManager(WSManager):
         list_name: str,
     ) -> None:
         await websocket.accept()
-        async with self._lock:
-            self._connections[user.id] = websocket
-            if game_id not in self._games:
-                self._games[game_id] = {"players": {}, "spectators": {}}
-            self._games[game_id][list_name][user.id] = user
+        await self._add(
+            user.id,
+            websocket,
+            lambda: self._disconnect_user_from_game(
+                user.id, game_id, list_name, websocket
+            ),
+        )
+        self._user_games[user.id] = (game_id, list_name)
+        if game_id not in self._games:
+            self._games[game_id] = {"players": {}, "spectators": {}}
+        self._games[game_id][list_name][user.id] = user
 
     async def _disconnect_user_from_game(
-        self, user_id: UUID, game_id: UUID, list_name: str
+        self,
+        user_id: UUID,
+        game_id: UUID,
+        list_name: str,
+        websocket: WebSocket | None = None,
     ) -> None:
-        await super().disconnect(user_id)
-        async with self._lock:
-            if game_id in self._games and list_name in self._games[game_id]:
-                self._games[game_id][list_name].pop(user_id, None)
-                if not self._games[game_id].get("players") and not self._games[
-                    game_id
-                ].get("spectators"):
-                    del self._games[game_id]
+        """
+        Remove the user from the list of the game, and drop the connection
+        if it is still ``websocket``. A user that reconnected to the same
+        list keeps the membership of the new connection.
+        """
+        if self._owns(user_id, websocket):
+            await super().disconnect(user_id)
+            self._user_games.pop(user_id, None)
+        elif self._user_games.get(user_id) == (game_id, list_name):
+            return
+        if game_id in self._games and list_name in self._games[game_id]:
+            self._games[game_id][list_name].pop(user_id, None)
+            if not self._games[game_id].get("players") and not self._games[
+                game_id
+            ].get("spectators"):
+                del self._games[game_id]
 
 
-notification_ws_manager = NotificationWSManager()
-lobby_ws_manager = LobbyWSManager()
-game_ws_manager = GameWSManager()
+heartbeat = Heartbeat()
+notification_ws_manager = NotificationWSManager(broker, heartbeat)
+lobby_ws_manager = LobbyWSManager(broker, heartbeat)
+game_ws_manager = GameWSManager(broker, heartbeat)
@@ -19,7 +19,10 @@ async def notifications_ws(
     try:
         while True:
             data: dict = await websocket.receive_json()
+            notification_ws_manager.touch(user.id)
             event = data.get("event")
+            if event == "pong":
+                continue
             payload = data.get("data", {})
             try:
                 await EVENT_MAP[event](
@@ -33,4 +36,4 @@ async def notifications_ws(
                     ),
                 )
     except WebSocketDisconnect:
-        await notification_ws_manager.disconnect(user.id)
+        await notification_ws_manager.disconnect(user.id, websocket=websocket)
@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Sequence, Type
+from typing import Any, Sequence, Type
 from uuid import UUID
 
-from sqlalchemy import Row, delete, func, select, update
+from sqlalchemy import Row, column, delete, func, select, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import Base
@@ -58,8 +58,17 @@ class IRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def bulk_add(
-        self, inserts: list[dict[str, str | int | UUID | None]]
+    async def bulk_add(self, inserts: list[dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def bulk_update(
+        self,
+        /,
+        updates: list[dict[str, str | int | UUID | None]],
+        keys: Sequence[str] = ("id",),
+        increments: Sequence[str] = (),
+        **data: str | int | UUID,
     ) -> None:
         raise NotImplementedError
 
@@ -137,7 +146,7 @@ class SQLAlchemyRepository(IRepository):
         self,
         /,
         what_to_update: dict[str, str | int | UUID],
-        **data: str | int | UUID | datetime,
+        **data: str | int | UUID | datetime | None,
     ) -> None:
         stmt = update(self.model).filter_by(**what_to_update).values(**data)
         await self._session.execute(stmt)
@@ -167,7 +176,47 @@ class SQLAlchemyRepository(IRepository):
         stmt = delete(self.model).filter_by(**data)
         await self._session.execute(stmt)
 
-    async def bulk_add(
-        self, inserts: list[dict[str, str | int | UUID | None]]
-    ) -> None:
+    async def bulk_add(self, inserts: list[dict[str, Any]]) -> None:
+        if not inserts:
+            return
         await self._session.execute(self.model.__table__.insert(), inserts)
+
+    async def bulk_update(
+        self,
+        /,
+        updates: list[dict[str, str | int | UUID | None]],
+        keys: Sequence[str] = ("id",),
+        increments: Sequence[str] = (),
+        **data: str | int | UUID,
+    ) -> None:
+        """
+        Update many rows with one UPDATE ... FROM (VALUES ...) statement.
+
+        Rows are matched by the `keys` columns of every update
+        and additionally filtered by `data`. The `increments` columns
+        are added to the current values instead of replacing them, so
+        concurrent updates of a row are applied atomically.
+        """
+        if not updates:
+            return
+        table = self.model.__table__
+        names = list(updates[0])
+        rows = values(
+            *[column(name, table.c[name].type) for name in names],
+            name="updates",
+        ).data([tuple(row[name] for name in names) for row in updates])
+        stmt = (
+            update(self.model)
+            .where(*[table.c[key] == rows.c[key] for key in keys])
+            .filter_by(**data)
+            .values(
+                {
+                    name: table.c[name] + rows.c[name]
+                    if name in increments
+                    else rows.c[name]
+                    for name in names
+                    if name not in keys
+                }
+            )
+        )
+        await self._session.execute(stmt)
@@ -0,0 +1,214 @@
+"""
+Sharding of game and lobby rooms across worker processes.
+
+Rooms live in the memory of one worker, the owner of a room is picked by
+consistent hashing of the room id over the workers listed in
+``SHARD_URLS``. A worker that accepts a socket of a room it does not own
+pipes the socket to the same endpoint of the owner, HTTP requests about
+the room are proxied the same way.
+
+Start the workers from the ``src`` directory:
+python -m sharding --workers 4 --port 8000
+"""
+import argparse
+import asyncio
+import bisect
+import hashlib
+import os
+import subprocess
+import sys
+from typing import Sequence
+from uuid import UUID
+
+import httpx
+import websockets
+from fastapi import HTTPException, Request, Response, status
+from fastapi.websockets import WebSocket, WebSocketDisconnect
+
+from config import (
+    SHARD_ID,
+    SHARD_URLS,
+    UVICORN_WS_PING_INTERVAL,
+    UVICORN_WS_PING_TIMEOUT,
+)
+
+HTTP_SCHEMES = {"ws": "http", "wss": "https"}
+FORWARDED_HEADERS = ("authorization", "content-type")
+
+
+class HashRing:
+    """
+    Consistent hash ring, each node is placed on the ring ``replicas``
+    times so keys spread evenly and adding a node moves only its share.
+    """
+
+    def __init__(self, nodes_number: int, replicas: int = 128) -> None:
+        points = sorted(
+            (self._hash(f"{node}:{replica}"), node)
+            for node in range(nodes_number)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def get_node(self, key: str) -> int:
+        position = bisect.bisect(self._hashes, self._hash(key))
+        return self._nodes[position % len(self._nodes)]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+
+class ShardRouter:
+    def __init__(self, shard_id: int, urls: Sequence[str]) -> None:
+        self.shard_id = shard_id
+        self._urls = [url.rstrip("/") for url in urls]
+        self._ring = HashRing(len(self._urls)) if self._urls else None
+
+    @property
+    def is_enabled(self) -> bool:
+        return self._ring is not None
+
+    def get_owner(self, room_id: UUID) -> int:
+        if self._ring is None:
+            return self.shard_id
+        return self._ring.get_node(str(room_id))
+
+    def is_local(self, room_id: UUID) -> bool:
+        return self.get_owner(room_id) == self.shard_id
+
+    def get_url(self, room_id: UUID, path: str) -> str:
+        return f"{self._urls[self.get_owner(room_id)]}{path}"
+
+
+async def forward_request(request: Request, url: str) -> Response:
+    """
+    Send the HTTP request to the same endpoint at ``url`` and return the
+    response of the owner.
+    """
+    target = httpx.URL(url)
+    target = target.copy_with(
+        scheme=HTTP_SCHEMES.get(target.scheme, target.scheme),
+        query=request.url.query.encode(),
+    )
+    headers = {
+        name: request.headers[name]
+        for name in FORWARDED_HEADERS
+        if name in request.headers
+    }
+    try:
+        async with httpx.AsyncClient() as client:
+            upstream = await client.request(
+                request.method,
+                target,
+                headers=headers,
+                content=await request.body(),
+            )
+    except httpx.HTTPError:
+        raise HTTPException(
+            status.HTTP_502_BAD_GATEWAY, detail="Shard is unavailable."
+        )
+    return Response(
+        upstream.content,
+        status_code=upstream.status_code,
+        media_type=upstream.headers.get("content-type"),
+    )
+
+
+async def forward_websocket(websocket: WebSocket, url: str) -> None:
+    """
+    Pipe the frames of an accepted client socket to ``url`` and back until
+    either side closes.
+    """
+    headers = [
+        (name, websocket.headers[name])
+        for name in ("authorization",)
+        if name in websocket.headers
+    ]
+    try:
+        upstream = await websockets.connect(url, extra_headers=headers)
+    except (OSError, websockets.InvalidHandshake):
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    async def to_upstream() -> None:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            text = message.get("text")
+            await upstream.send(text if text is not None else message["bytes"])
+
+    async def to_client() -> None:
+        async for message in upstream:
+            if isinstance(message, bytes):
+                await websocket.send_bytes(message)
+            else:
+                await websocket.send_text(message)
+
+    tasks = [
+        asyncio.create_task(to_upstream()),
+        asyncio.create_task(to_client()),
+    ]
+    try:
+        done, _ = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await upstream.close()
+    client_closed = any(
+        isinstance(task.exception(), WebSocketDisconnect)
+        for task in done
+        if not task.cancelled()
+    )
+    if not client_closed:
+        await websocket.close()
+
+
+shard_router = ShardRouter(SHARD_ID, SHARD_URLS)
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Start sharded workers.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    ports = [args.port + shard_id for shard_id in range(args.workers)]
+    urls = ",".join(f"ws://{args.host}:{port}" for port in ports)
+    processes = [
+        subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "main:app",
+                "--host",
+                args.host,
+                "--port",
+                str(port),
+                "--ws-ping-interval",
+                str(UVICORN_WS_PING_INTERVAL),
+                "--ws-ping-timeout",
+                str(UVICORN_WS_PING_TIMEOUT),
+            ],
+            env=os.environ | {"SHARD_ID": str(shard_id), "SHARD_URLS": urls},
+        )
+        for shard_id, port in enumerate(ports)
+    ]
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,10 @@ from game.repositories import (
     CardRepository,
     DealingRepository,
     EntryRepository,
+    GameEventRepository,
     GamePlayerRepository,
     GameRepository,
+    GameSnapshotRepository,
     GameWinnerRepository,
     LobbyPlayerRepository,
     LobbyRepository,
@@ -27,6 +29,8 @@ class IUnitOfWork(ABC):
     dealings: DealingRepository
     cards: CardRepository
     entries: EntryRepository
+    game_events: GameEventRepository
+    game_snapshots: GameSnapshotRepository
 
     @abstractmethod
     def __init__(self):
@@ -50,7 +54,7 @@ class IUnitOfWork(ABC):
 
 
 class UnitOfWork(IUnitOfWork):
-    def __init__(self):
+    def __init__(self) -> None:
         self.session_factory = async_session_maker
 
     async def __aenter__(self):
@@ -66,6 +70,8 @@ class UnitOfWork(IUnitOfWork):
         self.dealings = DealingRepository(self._session)
         self.cards = CardRepository(self._session)
         self.entries = EntryRepository(self._session)
+        self.game_events = GameEventRepository(self._session)
+        self.game_snapshots = GameSnapshotRepository(self._session)
 
     async def __aexit__(self, *args):
         await self.rollback()